@@ -26,6 +26,7 @@ import configparser
 import json
 import botocore.exceptions
 import traceback
+import cis_inventory
 
 ARG_HELP = """
 ########################## ac7-11-1-AMIs-not-public.py ##############################
@@ -39,18 +40,20 @@ ARG_HELP = """
 ###############################################################################
 """
 
-def main(args):
-    ec2 = boto3.client('ec2', region_name=args.region)
-    instances = ec2.describe_instances()['Reservations']
+def main(args, inventory=None):
+    if inventory is None:
+        inventory = cis_inventory.get_inventory(args)
+    instances = inventory.reservations()
+    # Resolve each unique AMI once, in batches, instead of once per instance
+    amis = inventory.images([i['ImageId'] for instance in instances for i in instance['Instances']])
     for instance in instances:
         #print(instance)
         for i in instance['Instances']:
             image_id = i['ImageId']
             instance_id = i['InstanceId']
-            amis = ec2.describe_images(Filters = [{'Name' : 'image-id', 'Values' : [image_id]}])['Images']
-            for ami in amis:
-                if ami['Public']:
-                    print("Instance %s is using public AMI. Image name: %s ImageId: %s" % (instance_id, ami['Name'], image_id))
+            ami = amis.get(image_id)
+            if ami and ami['Public']:
+                print("Instance %s is using public AMI. Image name: %s ImageId: %s" % (instance_id, ami['Name'], image_id))
 
 
 if __name__ == '__main__':
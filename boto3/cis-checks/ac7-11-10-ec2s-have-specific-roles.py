@@ -26,6 +26,7 @@ import configparser
 import json
 import botocore.exceptions
 import traceback
+import cis_inventory
 from datetime import datetime
 
 ARG_HELP = """
@@ -40,18 +41,14 @@ ARG_HELP = """
 ###############################################################################
 """
 
-def main(args):
-    ec2 = boto3.client('ec2', region_name=args.region)
-    iam = boto3.client('iam', region_name=args.region)
-    reservations = ec2.describe_instances(
-        Filters=[{'Name' : 'instance-state-name', 
-                  'Values' : ['pending', 
-                              'running', 
-                              'shutting-down', 
-                              'stopping',
-                              'stopped']}])['Reservations']
+def main(args, inventory=None):
+    if inventory is None:
+        inventory = cis_inventory.get_inventory(args)
+    reservations = inventory.reservations()
     for res in reservations:
         for r in res['Instances']:
+            if r['State']['Name'] not in ['pending', 'running', 'shutting-down', 'stopping', 'stopped']:
+                continue
             # Get instance name from Tags
             for kv_pair in r['Tags']:
                 if kv_pair['Key'] == 'Name':
@@ -60,8 +57,7 @@ def main(args):
             #Check if a role is assigned to the instance
             if 'IamInstanceProfile' in r:
                 instance_profile_name = r['IamInstanceProfile']['Arn'].split('/')[-1]
-                profile_details = iam.get_instance_profile(InstanceProfileName=instance_profile_name)['InstanceProfile']
-                roles = profile_details['Roles']
+                roles = inventory.instance_profile_roles(instance_profile_name)
                 print("Instance %s (%s) has Instance Profile %s with these role(s) attached:" % (instance_id, instance_name, instance_profile_name))
                 for role in roles:
                     role_name = role['RoleName']
@@ -26,6 +26,7 @@ import configparser
 import json
 import botocore.exceptions
 import traceback
+import cis_inventory
 
 ARG_HELP = """
 ########################## ac7-11-11-amis-encrypted.py ##############################
@@ -42,12 +43,11 @@ ARG_HELP = """
 RED = '\033[91m'
 RESET = '\033[0m'
 
-def main(args):
-    # Create an EC2 client
-    ec2 = boto3.client('ec2', region_name=args.region)
-    
+def main(args, inventory=None):
+    if inventory is None:
+        inventory = cis_inventory.get_inventory(args)
     # Describe all images
-    images = ec2.describe_images(Owners=['self'])['Images']
+    images = inventory.owned_images()
     print("Images:")
     for image in images:
         if 'BlockDeviceMappings' in image:
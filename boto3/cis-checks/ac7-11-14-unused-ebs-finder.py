@@ -26,6 +26,7 @@ import configparser
 import json
 import botocore.exceptions
 import traceback
+import cis_inventory
 
 ARG_HELP = """
 ########################## ac7-11-14-unused-ebs-finder.py ##############################
@@ -39,10 +40,10 @@ ARG_HELP = """
 ###############################################################################
 """
 
-def main(args):
-    ec2 = boto3.client('ec2', region_name=args.region)
-    #volumes = ec2.describe_volumes(Filter=['Name' : 'attachment.status', 'Values' : ['attached']])
-    volumes = ec2.describe_volumes(Filters=[{'Name' : 'status', 'Values' : ['available']}])['Volumes']
+def main(args, inventory=None):
+    if inventory is None:
+        inventory = cis_inventory.get_inventory(args)
+    volumes = [v for v in inventory.volumes() if v['State'] == 'available']
     print("Searching for detached volumes...")
     if volumes:
         for vol in volumes:
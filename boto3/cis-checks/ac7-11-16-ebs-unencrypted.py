@@ -26,6 +26,7 @@ import configparser
 import json
 import botocore.exceptions
 import traceback
+import cis_inventory
 
 ARG_HELP = """
 ########################## ac7-11-16-ebs-unencrypted.py ##############################
@@ -38,9 +39,10 @@ ARG_HELP = """
 ###############################################################################
 """
 
-def main(args):
-    ec2 = boto3.client('ec2', region_name=args.region)
-    ebs = ec2.describe_volumes()['Volumes']
+def main(args, inventory=None):
+    if inventory is None:
+        inventory = cis_inventory.get_inventory(args)
+    ebs = inventory.volumes()
     print("Checking encryption status for each volume...")
     for v in ebs:
         encrypted = v['Encrypted']
@@ -26,6 +26,7 @@ import configparser
 import json
 import botocore.exceptions
 import traceback
+import cis_inventory
 from datetime import datetime
 
 ARG_HELP = """
@@ -40,9 +41,10 @@ ARG_HELP = """
 ###############################################################################
 """
 
-def main(args):
-    ec2 = boto3.client('ec2', region_name=args.region)
-    reservations = ec2.describe_instances()['Reservations']
+def main(args, inventory=None):
+    if inventory is None:
+        inventory = cis_inventory.get_inventory(args)
+    reservations = inventory.reservations()
     current_date = datetime.now()
     for res in reservations:
         instances = res['Instances']
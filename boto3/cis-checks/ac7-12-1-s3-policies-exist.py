@@ -26,6 +26,7 @@ import configparser
 import json
 import botocore.exceptions
 import traceback
+import cis_inventory
 
 ARG_HELP = """
 ########################## ac7-12-1-s3-policies-exist.py ##############################
@@ -39,22 +40,20 @@ ARG_HELP = """
 ###############################################################################
 """
 
-def main(args):
-    s3 = boto3.client('s3')
-    buckets = s3.list_buckets()['Buckets']
-    for b in buckets:
-        name = b['Name']
-        try:
-            policy = s3.get_bucket_policy(Bucket=name)['Policy']
-            policy = json.loads(policy)
+def main(args, inventory=None):
+    if inventory is None:
+        inventory = cis_inventory.get_inventory(args)
+    buckets = inventory.bucket_details('Policy')
+    for name, b in buckets.items():
+        if 'Policy' in b['Errors']:
+            print("\tUnexpected error: %s" % b['Errors']['Policy'])
+        elif b['Policy']:
+            policy = json.loads(b['Policy'])
             json_policy = json.dumps(policy, indent=4)
             print("Bucket policy for bucket name %s:" % name)
             print(json_policy)
-        except botocore.exceptions.ClientError as e:
-            if e.response['Error']['Code'] == "NoSuchBucketPolicy":
-                print("\033[91mNo S3 bucket policy found for bucket name %s.\n\033[0m" % name)  # Highlighted in red
-            else:
-                print("\tUnexpected error: %s" % e)
+        else:
+            print("\033[91mNo S3 bucket policy found for bucket name %s.\n\033[0m" % name)  # Highlighted in red
         print('-' * 80)
 
 
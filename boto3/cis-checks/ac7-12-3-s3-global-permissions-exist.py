@@ -26,6 +26,7 @@ import configparser
 import json
 import botocore.exceptions
 import traceback
+import cis_inventory
 
 ARG_HELP = """
 ########################## ac7-12-3-s3-global-permissions-exist.py ##############################
@@ -39,13 +40,15 @@ ARG_HELP = """
 ###############################################################################
 """
 
-def main(args):
-    s3 = boto3.client('s3')
-    buckets = s3.list_buckets()['Buckets']
-    for b in buckets:
-        name = b['Name']
-        acl = s3.get_bucket_acl(Bucket=name)['Grants']
+def main(args, inventory=None):
+    if inventory is None:
+        inventory = cis_inventory.get_inventory(args)
+    buckets = inventory.bucket_details('Grants')
+    for name, b in buckets.items():
         print("Checking bucket grantee pemisssions on all rules for %s" % name)
+        if 'Grants' in b['Errors']:
+            print("\tUnexpected error: %s" % b['Errors']['Grants'])
+        acl = b['Grants'] or []
         for grants in acl:
             grantee = grants['Grantee']
             if grantee['Type'] == 'Group':
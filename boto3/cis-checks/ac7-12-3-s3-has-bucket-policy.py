@@ -26,6 +26,7 @@ import configparser
 import json
 import botocore.exceptions
 import traceback
+import cis_inventory
 
 ARG_HELP = """
 ########################## ac7-12-3-s3-has-bucket-policy.py ##############################
@@ -37,21 +38,18 @@ ARG_HELP = """
 ###############################################################################
 """
 
-def main(args):
-    s3 = boto3.client('s3')
-    buckets = s3.list_buckets()['Buckets']
-    for b in buckets:
-        name = b['Name']
+def main(args, inventory=None):
+    if inventory is None:
+        inventory = cis_inventory.get_inventory(args)
+    buckets = inventory.bucket_details('Policy')
+    for name, b in buckets.items():
         print("Checking bucket policy for %s" % name)
-        try:
-            policy = s3.get_bucket_policy(Bucket=name)['Policy']
-            if policy:
-                print("\tPASS: Bucket %s has a policy defined." % name)
-        except botocore.exceptions.ClientError as e:
-            if e.response['Error']['Code'] == "NoSuchBucketPolicy":
-                print("\tFAIL: No bucket policy defined for %s" % name)
-            else:
-                print("\tUnexpected error: %s" % e)
+        if 'Policy' in b['Errors']:
+            print("\tUnexpected error: %s" % b['Errors']['Policy'])
+        elif b['Policy']:
+            print("\tPASS: Bucket %s has a policy defined." % name)
+        else:
+            print("\tFAIL: No bucket policy defined for %s" % name)
         print('-' * 80)
 
 
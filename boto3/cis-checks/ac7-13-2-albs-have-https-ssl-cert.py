@@ -26,6 +26,7 @@ import configparser
 import json
 import botocore.exceptions
 import traceback
+import cis_inventory
 
 ARG_HELP = """
 ########################## ac7-13-2-albs-have-https-ssl-cert.py ##############################
@@ -38,9 +39,11 @@ ARG_HELP = """
 ###############################################################################
 """
 
-def main(args):
-    elb = boto3.client('elbv2', region_name=args.region)
-    albs = elb.describe_load_balancers()['LoadBalancers']
+def main(args, inventory=None):
+    if inventory is None:
+        inventory = cis_inventory.get_inventory(args)
+    elb = inventory.client('elbv2')
+    albs = inventory.load_balancers()
     lb_identified = False
     for alb in albs:
         lb_name = alb['LoadBalancerName']
@@ -26,6 +26,7 @@ import configparser
 import json
 import botocore.exceptions
 import traceback
+import cis_inventory
 
 ARG_HELP = """
 ########################## ac7-13-3-elbs-have-tls-protocol.py ##############################
@@ -38,9 +39,11 @@ ARG_HELP = """
 ###############################################################################
 """
 
-def main(args):
-    elbv2 = boto3.client('elbv2', region_name=args.region)
-    elbs = elbv2.describe_load_balancers()['LoadBalancers']
+def main(args, inventory=None):
+    if inventory is None:
+        inventory = cis_inventory.get_inventory(args)
+    elbv2 = inventory.client('elbv2')
+    elbs = inventory.load_balancers()
     if elbs:
         for elb in elbs:
             elb_arn = elb['LoadBalancerArn']
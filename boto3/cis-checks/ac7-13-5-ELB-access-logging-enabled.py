@@ -26,6 +26,7 @@ import configparser
 import json
 import botocore.exceptions
 import traceback
+import cis_inventory
 
 ARG_HELP = """
 ########################## ac7-13-5-ELB-access-logging-enabled.py ##############################
@@ -38,9 +39,11 @@ ARG_HELP = """
 ###############################################################################
 """
 
-def main(args):
-    elb = boto3.client('elbv2', region_name = args.region)
-    elbs = elb.describe_load_balancers()['LoadBalancers']
+def main(args, inventory=None):
+    if inventory is None:
+        inventory = cis_inventory.get_inventory(args)
+    elb = inventory.client('elbv2')
+    elbs = inventory.load_balancers()
     for elb_details in elbs:
         elb_name = elb_details['LoadBalancerName']
         elb_arn = elb_details['LoadBalancerArn']
@@ -26,6 +26,7 @@ import configparser
 import json
 import botocore.exceptions
 import traceback
+import cis_inventory
 
 ARG_HELP = """
 ########################## ac7-16-1-Email-subscriptions-use-admin.py ##############################
@@ -37,24 +38,22 @@ ARG_HELP = """
 ###############################################################################
 """
 
-def main(args):
-    sns = boto3.client('sns', region_name=args.region)
-    paginator = sns.get_paginator('list_subscriptions')
-    page_iter = paginator.paginate()
+def main(args, inventory=None):
+    if inventory is None:
+        inventory = cis_inventory.get_inventory(args)
     print("Checking for subscriptions that use email endpoint protocol...")
     foundSNS = False
-    for page in page_iter:
-        for p in page['Subscriptions']:
-            foundSNS = True
-            sub_arn = p['SubscriptionArn']
-            topic_arn = p['TopicArn']
-            endpoint = p['Endpoint']
-            protocol = p['Protocol']
-            if protocol == "email":
-                if "@made-up-company.com" in endpoint or "@am.made-up-company.com" in endpoint:
-                    print("\tPASS: %s is a valid email and endpoint for SNS subscription. Subscription ARN: %s" % (endpoint, sub_arn))
-                else:
-                    print("\tFAIL: %s does not appear to be a valid email. Subscription ARN: %s" % (endpoint, sub_arn))
+    for p in inventory.sns_subscriptions():
+        foundSNS = True
+        sub_arn = p['SubscriptionArn']
+        topic_arn = p['TopicArn']
+        endpoint = p['Endpoint']
+        protocol = p['Protocol']
+        if protocol == "email":
+            if "@made-up-company.com" in endpoint or "@am.made-up-company.com" in endpoint:
+                print("\tPASS: %s is a valid email and endpoint for SNS subscription. Subscription ARN: %s" % (endpoint, sub_arn))
+            else:
+                print("\tFAIL: %s does not appear to be a valid email. Subscription ARN: %s" % (endpoint, sub_arn))
     
     if foundSNS == False:
         print("\tFAIL: @made-up-company.com does not appear to be a valid email used in an SNS subscription.")
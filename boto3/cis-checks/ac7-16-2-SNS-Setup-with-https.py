@@ -26,6 +26,7 @@ import configparser
 import json
 import botocore.exceptions
 import traceback
+import cis_inventory
 
 ARG_HELP = """
 ########################## ac7-16-2-SNS-Setup-with-https.py ##############################
@@ -37,9 +38,10 @@ ARG_HELP = """
 ###############################################################################
 """
 
-def main(args):
-    sns = boto3.client('sns', region_name=args.region)
-    sns_subscriptions = sns.list_subscriptions()['Subscriptions']
+def main(args, inventory=None):
+    if inventory is None:
+        inventory = cis_inventory.get_inventory(args)
+    sns_subscriptions = inventory.sns_subscriptions()
     if len(sns_subscriptions) == 0:
         print("No SNS Subscriptions found")
     else:
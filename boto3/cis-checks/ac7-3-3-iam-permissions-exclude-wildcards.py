@@ -25,6 +25,8 @@ import configparser
 import json
 import botocore.exceptions
 import traceback
+import urllib.parse
+import cis_inventory
 
 ARG_HELP = """
 ################ ac7-3-3-iam-permissions-exclude-wildcards.py ##################
@@ -37,30 +39,29 @@ ARG_HELP = """
 ###############################################################################
 """
 
-def main(args):
-    iam = boto3.client("iam")
-    policies = iam.list_policies(Scope='Local')['Policies']
+def default_policy_document(policy):
+    """Return the document of the default version from an authorization details policy."""
+    for version in policy['PolicyVersionList']:
+        if version['IsDefaultVersion']:
+            policy_doc = version['Document']
+            # Documents are normally decoded by boto3, but may arrive URL encoded
+            if isinstance(policy_doc, str):
+                policy_doc = json.loads(urllib.parse.unquote(policy_doc))
+            return policy_doc
+
+
+def main(args, inventory=None):
+    if inventory is None:
+        inventory = cis_inventory.get_inventory(args)
+    # All customer managed policies and their versions in a few paginated calls
+    policies = inventory.local_managed_policies()
     print("Checkng for wildcards in policy documents (Scoped to customer managed policies)...")
-    #print(policies)
-    #sys.exit()
     for policy in policies:
         wildcard_found = False
         policy_name = policy['PolicyName']
-        #policy_id = policy['PolicyId']
-        policy_arn = policy['Arn']
-        
-        # Get the policy version
-        policy_versions_response = iam.list_policy_versions(PolicyArn=policy_arn)
-        
-        # Loop through policy versions to find the default version
-        for version in policy_versions_response['Versions']:
-            if version['IsDefaultVersion']:
-                version_id = version['VersionId']
-                break
-        
+
         # Get the policy document for the default version
-        policy_doc_response = iam.get_policy_version(PolicyArn=policy_arn, VersionId=version_id)
-        policy_doc = policy_doc_response['PolicyVersion']['Document']
+        policy_doc = default_policy_document(policy)
         
         statement = policy_doc['Statement']
         #For single statement, enclose into a list for consistency
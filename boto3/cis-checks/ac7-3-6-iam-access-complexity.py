@@ -26,6 +26,7 @@ import configparser
 import json
 import botocore.exceptions
 import traceback
+import cis_inventory
 
 ARG_HELP = """
 ################ ac7-3-6-iam-access-complexity.py ##################
@@ -40,8 +41,10 @@ ARG_HELP = """
 ###############################################################################
 """
 
-def main(args):
-    iam = boto3.client('iam')
+def main(args, inventory=None):
+    if inventory is None:
+        inventory = cis_inventory.get_inventory(args)
+    iam = inventory.client('iam')
     acct_pwd_policy = iam.get_account_password_policy()['PasswordPolicy']
     json_policy = json.dumps(acct_pwd_policy, indent=4)
     print("Account Password Policy for account %s" % args.profile)
@@ -26,6 +26,7 @@ import configparser
 import json
 import botocore.exceptions
 import traceback
+import cis_inventory
 
 ARG_HELP = """
 ################ ac7-5-3-VPC-created.py ##################
@@ -39,9 +40,10 @@ ARG_HELP = """
 ###############################################################################
 """
 
-def main(args):
-    ec2 = boto3.client('ec2', region_name=args.region)
-    default_vpc = ec2.describe_vpcs(Filters=[{'Name': 'isDefault','Values': ['true']}])['Vpcs']
+def main(args, inventory=None):
+    if inventory is None:
+        inventory = cis_inventory.get_inventory(args)
+    default_vpc = [vpc for vpc in inventory.vpcs() if vpc['IsDefault']]
     if default_vpc:
         for vpc in default_vpc:
             vpc_id = vpc['VpcId']
@@ -26,6 +26,7 @@ import configparser
 import json
 import botocore.exceptions
 import traceback
+import cis_inventory
 
 ARG_HELP = """
 ################ ac7-5-4-VPC-flow-logging-enabled.py ##################
@@ -40,9 +41,10 @@ ARG_HELP = """
 ###############################################################################
 """
 
-def main(args):
-    ec2 = boto3.client('ec2', region_name=args.region)
-    flow_logs = ec2.describe_flow_logs()['FlowLogs']
+def main(args, inventory=None):
+    if inventory is None:
+        inventory = cis_inventory.get_inventory(args)
+    flow_logs = inventory.flow_logs()
     for fl in flow_logs:
         #print(fl)
         try:
@@ -26,6 +26,7 @@ import configparser
 import json
 import botocore.exceptions
 import traceback
+import cis_inventory
 
 ARG_HELP = """
 ################ ac7-5-6-NACLs-deny-traffic-on-default-vpc.py ##################
@@ -39,9 +40,10 @@ ARG_HELP = """
 ###############################################################################
 """
 
-def main(args):
-    ec2 = boto3.client('ec2', region_name=args.region)
-    default_nacl = ec2.describe_network_acls(Filters=[{'Name' : 'default', 'Values' : ['true']}])['NetworkAcls']
+def main(args, inventory=None):
+    if inventory is None:
+        inventory = cis_inventory.get_inventory(args)
+    default_nacl = [nacl for nacl in inventory.network_acls() if nacl['IsDefault']]
     for nacl in default_nacl:
         print("Default NACL %s entries:" % nacl['NetworkAclId'])
         if nacl['Entries']:
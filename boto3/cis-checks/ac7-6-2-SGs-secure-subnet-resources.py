@@ -26,6 +26,7 @@ import configparser
 import json
 import botocore.exceptions
 import traceback
+import cis_inventory
 
 ARG_HELP = """
 ################ ac7-6-2-SGs-secure-subnet-resources.py ##################
@@ -39,13 +40,15 @@ ARG_HELP = """
 ###############################################################################
 """
 
-def main(args):
-    ec2 = boto3.client('ec2', region_name=args.region)
-    subnets = ec2.describe_subnets()['Subnets']
+def main(args, inventory=None):
+    if inventory is None:
+        inventory = cis_inventory.get_inventory(args)
+    enis_by_subnet = inventory.network_interfaces_by_subnet()
+    subnets = inventory.subnets()
     for s in subnets:
         subnet_id = s['SubnetId']
         print("Resources in subnet %s...\n\n" % subnet_id)
-        net_interface = ec2.describe_network_interfaces(Filters=[{'Name' : 'subnet-id', 'Values': [subnet_id]}])['NetworkInterfaces']
+        net_interface = enis_by_subnet.get(subnet_id, [])
         for resource in net_interface:
             resource_name = resource['NetworkInterfaceId']
             sec_groups = resource['Groups']
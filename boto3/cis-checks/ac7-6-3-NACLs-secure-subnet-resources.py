@@ -26,6 +26,7 @@ import configparser
 import json
 import botocore.exceptions
 import traceback
+import cis_inventory
 
 ARG_HELP = """
 ################ ac7-6-3-NACLs-secure-subnet-resources.py ##################
@@ -39,13 +40,15 @@ ARG_HELP = """
 ###############################################################################
 """
 
-def main(args):
-    ec2 = boto3.client('ec2', region_name=args.region)
-    subnets = ec2.describe_subnets()['Subnets']
+def main(args, inventory=None):
+    if inventory is None:
+        inventory = cis_inventory.get_inventory(args)
+    nacls_by_subnet = inventory.nacls_by_subnet()
+    subnets = inventory.subnets()
     for s in subnets:
         subnet_id = s['SubnetId']
         print("Checking subnet %s..." % subnet_id)
-        nacls = ec2.describe_network_acls(Filters=[{'Name' : 'association.subnet-id', 'Values' : [subnet_id]}])['NetworkAcls']
+        nacls = nacls_by_subnet.get(subnet_id, [])
         if nacls:
             for nacl in nacls:
                 #associations = nacl['Associations']
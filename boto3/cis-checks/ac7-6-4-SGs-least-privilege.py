@@ -26,6 +26,7 @@ import configparser
 import json
 import botocore.exceptions
 import traceback
+import cis_inventory
 
 ARG_HELP = """
 ################ ac7-6-4-SGs-least-privilege.py ##################
@@ -46,9 +47,10 @@ def highlight_cider_ip(rule):
     else:
         return json.dumps(rule, indent=4)
         
-def main(args):
-    ec2 = boto3.client('ec2', region_name=args.region)
-    sec_groups = ec2.describe_security_groups()['SecurityGroups']
+def main(args, inventory=None):
+    if inventory is None:
+        inventory = cis_inventory.get_inventory(args)
+    sec_groups = inventory.security_groups()
     for s in sec_groups:
         sg_name = s['GroupName']
         permissions = s['IpPermissions']
@@ -27,6 +27,7 @@ import configparser
 import json
 import botocore.exceptions
 import traceback
+import cis_inventory
 
 ARG_HELP = """
 ################ ac7-6-6-subnet-rt-association.py ##################
@@ -41,13 +42,15 @@ ARG_HELP = """
 ###############################################################################
 """
 
-def main(args):
-    ec2 = boto3.client('ec2', region_name=args.region)
-    subnets = ec2.describe_subnets()['Subnets']
+def main(args, inventory=None):
+    if inventory is None:
+        inventory = cis_inventory.get_inventory(args)
+    route_tables_by_subnet = inventory.route_tables_by_subnet()
+    subnets = inventory.subnets()
     for s in subnets:
         subnet_id = s['SubnetId']
         print("Subnet %s details...\n" % subnet_id)
-        route_tables = ec2.describe_route_tables(Filters=[{'Name' : 'association.subnet-id', 'Values' : [subnet_id]}])['RouteTables']
+        route_tables = route_tables_by_subnet.get(subnet_id, [])
         
         if route_tables:
             print("PASS: Route tables other than the implicit main route table are attached.")
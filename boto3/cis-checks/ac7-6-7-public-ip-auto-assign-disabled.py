@@ -26,6 +26,7 @@ import configparser
 import json
 import botocore.exceptions
 import traceback
+import cis_inventory
 
 ARG_HELP = """
 ################ ac7-6-7-public-ip-auto-assign-disabled.py ##################
@@ -38,9 +39,10 @@ ARG_HELP = """
 ###############################################################################
 """
 
-def main(args):
-    ec2 = boto3.client('ec2', region_name=args.region)
-    subnets = ec2.describe_subnets()['Subnets']
+def main(args, inventory=None):
+    if inventory is None:
+        inventory = cis_inventory.get_inventory(args)
+    subnets = inventory.subnets()
     for s in subnets:
         subnet_id = s['SubnetId']
         print("Subnet %s details...\n" % subnet_id)
@@ -26,6 +26,7 @@ import configparser
 import json
 import botocore.exceptions
 import traceback
+import cis_inventory
 
 ARG_HELP = """
 ################ ac7-6-8-NACL-rules-associated-with-NAT-gateways.py ##################
@@ -38,16 +39,17 @@ ARG_HELP = """
 ###############################################################################
 """
 
-def main(args):
-    ec2 = boto3.client('ec2', region_name=args.region)
-    nat_gateways = ec2.describe_nat_gateways()['NatGateways']
+def main(args, inventory=None):
+    if inventory is None:
+        inventory = cis_inventory.get_inventory(args)
+    nat_gateways = inventory.nat_gateways()
     if nat_gateways:
-        
+        nacls_by_subnet = inventory.nacls_by_subnet()
         for ngw in nat_gateways:
             ngw_id = ngw['NatGatewayId']
             subnet_id = ngw['SubnetId']
             print("Retrieving NACL Rules for subnet %s NAT Gateway %s..." % (subnet_id, ngw_id))
-            nacls = ec2.describe_network_acls(Filters=[{'Name' : 'association.subnet-id', 'Values' : [subnet_id]}])['NetworkAcls']
+            nacls = nacls_by_subnet.get(subnet_id, [])
             
             for nacl in nacls:
                 rules = nacl['Entries']
@@ -26,6 +26,7 @@ import configparser
 import json
 import botocore.exceptions
 import traceback
+import cis_inventory
 
 ARG_HELP = """
 ################ ac7-7-2-SGs-no-all-traffic-ports.py ##################
@@ -41,9 +42,10 @@ ARG_HELP = """
 ###############################################################################
 """
 
-def main(args):
-    ec2 = boto3.client('ec2', region_name = args.region)
-    sec_groups = ec2.describe_security_groups()['SecurityGroups']
+def main(args, inventory=None):
+    if inventory is None:
+        inventory = cis_inventory.get_inventory(args)
+    sec_groups = inventory.security_groups()
     for sg in sec_groups:
         sg_name = sg['GroupName']
         ingress_rules = sg['IpPermissions']
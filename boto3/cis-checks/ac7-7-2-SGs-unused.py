@@ -26,6 +26,7 @@ import configparser
 import json
 import botocore.exceptions
 import traceback
+import cis_inventory
 
 ARG_HELP = """
 ########################## ac7-7-2-SGs-unused.py ##############################
@@ -38,18 +39,17 @@ ARG_HELP = """
 ###############################################################################
 """
 
-def main(args):
-    ec2 = boto3.client('ec2', region_name = args.region)
-    all_instances = ec2.describe_instances()
-    sec_groups = ec2.describe_security_groups()
+def main(args, inventory=None):
+    if inventory is None:
+        inventory = cis_inventory.get_inventory(args)
     instance_sg_set = set()
     sg_set = set()
-    for reservation in all_instances["Reservations"]:
+    for reservation in inventory.reservations():
         for instance in reservation["Instances"]:
             for sg in instance["SecurityGroups"]:
                 instance_sg_set.add(sg["GroupName"])
 
-    for security_group in sec_groups["SecurityGroups"]:
+    for security_group in inventory.security_groups():
         sg_set.add(security_group["GroupName"])
 
     idle_sg = list(sg_set - instance_sg_set)
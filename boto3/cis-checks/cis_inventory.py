@@ -0,0 +1,365 @@
+"""
+Objective: Shared inventory snapshot for the cis-checks scripts. Each resource type is
+fetched once per account/region (fully paginated), kept in memory and handed to every
+check, so a full audit run makes one describe call per resource type instead of one per check.
+
+Technologies: python, boto3
+
+Related Documentation:
+    https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/ec2.html
+    https://boto3.amazonaws.com/v1/documentation/api/latest/guide/paginators.html
+
+Sessions are built from args.profile, and when args.role_arn is set the role is assumed
+with STS. The assumed-role credentials are cached per role and refreshed by botocore
+before they expire, so long multi-region/multi-account runs keep working.
+
+Usage (from a check's main):
+    inventory = cis_inventory.get_inventory(args)
+    sec_groups = inventory.security_groups()
+
+Author: Brendan Tuckey
+File location: https://github.com/brendantuckey/aws-code-snippets/blob/latest/boto3/cis-checks
+Updated: 10/18/2026
+
+"""
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import boto3
+import botocore.session
+import botocore.exceptions
+from botocore.config import Config
+from botocore.credentials import RefreshableCredentials
+
+# Per-bucket S3 details are fetched by this many threads at once
+S3_MAX_WORKERS = 32
+
+# Per-bucket S3 detail -> (client method, response key, error code meaning "not configured")
+BUCKET_PARTS = {
+    'Policy': ('get_bucket_policy', 'Policy', 'NoSuchBucketPolicy'),
+    'PolicyStatus': ('get_bucket_policy_status', 'PolicyStatus', 'NoSuchBucketPolicy'),
+    'Grants': ('get_bucket_acl', 'Grants', None),
+    'Encryption': ('get_bucket_encryption', 'ServerSideEncryptionConfiguration', 'ServerSideEncryptionConfigurationNotFoundError'),
+    'Logging': ('get_bucket_logging', 'LoggingEnabled', None),
+}
+
+
+def paginate(client, operation, result_key, **kwargs):
+    """Return every item for result_key across all pages of client.<operation>."""
+    if client.can_paginate(operation):
+        items = []
+        for page in client.get_paginator(operation).paginate(**kwargs):
+            items.extend(page.get(result_key, []))
+        return items
+    return getattr(client, operation)(**kwargs).get(result_key, [])
+
+
+class Inventory:
+    """In-memory snapshot of the resources used by the CIS checks for one account/region.
+
+    Every resource type is loaded lazily on first use and then reused by all checks
+    sharing this object. Loading is guarded by a lock so the snapshot can be shared
+    between threads.
+    """
+
+    def __init__(self, session, region, account=None):
+        self.session = session
+        self.region = region
+        # Key for the caches shared by all regions of an account (Default: this inventory only)
+        self.account = account if account is not None else object()
+        self._clients = {}
+        self._clients_lock = threading.Lock()
+        self._cache = {}
+        self._lock = threading.RLock()
+        self.api_calls = 0
+
+    def client(self, service, region=None):
+        """Return the cached client for service in region (Default: the inventory region)."""
+        region = region or self.region
+        with self._clients_lock:
+            if (service, region) not in self._clients:
+                config = Config(max_pool_connections=S3_MAX_WORKERS) if service == 's3' else None
+                self._clients[(service, region)] = self.session.client(service, region_name=region, config=config)
+            return self._clients[(service, region)]
+
+    def _load(self, service, operation, result_key, **kwargs):
+        # Keyed on the arguments too, so the same operation with other filters is loaded separately
+        key = (service, operation, result_key, repr(sorted(kwargs.items())))
+        with self._lock:
+            if key not in self._cache:
+                self._cache[key] = paginate(self.client(service), operation, result_key, **kwargs)
+                self.api_calls += 1
+            return self._cache[key]
+
+    def _index(self, name, build):
+        """Memoize an in-memory index built from the snapshot (eg. resources grouped by subnet)."""
+        with self._lock:
+            if name not in self._cache:
+                self._cache[name] = build()
+            return self._cache[name]
+
+    # EC2
+    def reservations(self):
+        return self._load('ec2', 'describe_instances', 'Reservations')
+
+    def instances(self):
+        return [i for res in self.reservations() for i in res['Instances']]
+
+    def security_groups(self):
+        return self._load('ec2', 'describe_security_groups', 'SecurityGroups')
+
+    def subnets(self):
+        return self._load('ec2', 'describe_subnets', 'Subnets')
+
+    def vpcs(self):
+        return self._load('ec2', 'describe_vpcs', 'Vpcs')
+
+    def network_acls(self):
+        return self._load('ec2', 'describe_network_acls', 'NetworkAcls')
+
+    def nacls_by_subnet(self):
+        """Network ACLs keyed by the subnet IDs they are associated with."""
+        def build():
+            index = {}
+            for nacl in self.network_acls():
+                for association in nacl.get('Associations', []):
+                    index.setdefault(association['SubnetId'], []).append(nacl)
+            return index
+        return self._index('nacls_by_subnet', build)
+
+    def nat_gateways(self):
+        return self._load('ec2', 'describe_nat_gateways', 'NatGateways')
+
+    def network_interfaces(self):
+        return self._load('ec2', 'describe_network_interfaces', 'NetworkInterfaces')
+
+    def network_interfaces_by_subnet(self):
+        """Network interfaces keyed by subnet ID."""
+        def build():
+            index = {}
+            for eni in self.network_interfaces():
+                index.setdefault(eni['SubnetId'], []).append(eni)
+            return index
+        return self._index('network_interfaces_by_subnet', build)
+
+    def route_tables(self):
+        return self._load('ec2', 'describe_route_tables', 'RouteTables')
+
+    def route_tables_by_subnet(self):
+        """Route tables keyed by the subnet IDs they are explicitly associated with."""
+        def build():
+            index = {}
+            for route_table in self.route_tables():
+                for association in route_table.get('Associations', []):
+                    if 'SubnetId' in association:
+                        index.setdefault(association['SubnetId'], []).append(route_table)
+            return index
+        return self._index('route_tables_by_subnet', build)
+
+    def volumes(self):
+        return self._load('ec2', 'describe_volumes', 'Volumes')
+
+    def owned_images(self):
+        return self._load('ec2', 'describe_images', 'Images', Owners=['self'])
+
+    def images(self, image_ids):
+        """Return {image id: image or None} for image_ids, resolved in batches through the shared AMI cache."""
+        return lookup_images(self.client('ec2'), self.region, image_ids)
+
+    def flow_logs(self):
+        return self._load('ec2', 'describe_flow_logs', 'FlowLogs')
+
+    # ELBv2
+    def load_balancers(self):
+        return self._load('elbv2', 'describe_load_balancers', 'LoadBalancers')
+
+    # IAM
+    def instance_profile_roles(self, instance_profile_name):
+        """Return the roles of an instance profile.
+
+        IAM is global, so all profiles are loaded in one paginated list_instance_profiles
+        sweep per account and shared by the inventories of all its regions; a profile
+        missing from the sweep (eg. created since) is fetched with get_instance_profile
+        and cached.
+        """
+        with _instance_profiles_lock:
+            if self.account not in _instance_profiles:
+                try:
+                    profiles = paginate(self.client('iam'), 'list_instance_profiles', 'InstanceProfiles')
+                except botocore.exceptions.ClientError as e:
+                    print("\tUnable to list instance profiles, looking them up one at a time: %s" % e)
+                    profiles = []
+                _instance_profiles[self.account] = {profile['InstanceProfileName']: profile['Roles'] for profile in profiles}
+            profile_roles = _instance_profiles[self.account]
+            if instance_profile_name not in profile_roles:
+                profile = self.client('iam').get_instance_profile(InstanceProfileName=instance_profile_name)['InstanceProfile']
+                profile_roles[instance_profile_name] = profile['Roles']
+            return profile_roles[instance_profile_name]
+
+    def local_managed_policies(self):
+        """Customer managed policies, each with its PolicyVersionList (documents included).
+
+        One paginated get_account_authorization_details sweep replaces list_policies plus
+        list_policy_versions/get_policy_version per policy.
+        """
+        return self._load('iam', 'get_account_authorization_details', 'Policies', Filter=['LocalManagedPolicy'])
+
+    # S3
+    def buckets(self):
+        return self._load('s3', 'list_buckets', 'Buckets')
+
+    def bucket_details(self, *parts):
+        """Return {bucket name: record} with the requested BUCKET_PARTS (Default: all) for every bucket.
+
+        Each bucket's details are fetched concurrently with a client for the bucket's own
+        region. A record holds 'Name', 'Region', one key per fetched part (None when that
+        part is not configured on the bucket) and 'Errors' {part: ClientError} for any
+        other failure. Parts already fetched are not fetched again.
+        """
+        parts = parts or tuple(BUCKET_PARTS)
+        with self._lock:
+            details = self._cache.setdefault('bucket_details', {})
+            fetched = self._cache.setdefault('bucket_parts', set())
+            missing = [part for part in parts if part not in fetched]
+            if missing:
+                buckets = [b for b in self.buckets() if b['Name'] not in details]
+                for b in buckets:
+                    details[b['Name']] = {'Name': b['Name'], 'Region': b.get('BucketRegion'), 'Errors': {}}
+                with ThreadPoolExecutor(max_workers=S3_MAX_WORKERS) as executor:
+                    list(executor.map(lambda record: self._fetch_bucket(record, missing), details.values()))
+                fetched.update(missing)
+            return details
+
+    def _fetch_bucket(self, record, parts):
+        name = record['Name']
+        if not record['Region']:
+            try:
+                location = self.client('s3').get_bucket_location(Bucket=name)['LocationConstraint']
+                record['Region'] = {None: 'us-east-1', 'EU': 'eu-west-1'}.get(location, location)
+            except botocore.exceptions.ClientError as e:
+                record['Errors']['Region'] = e
+                record['Region'] = self.region
+        s3 = self.client('s3', record['Region'])
+        for part in parts:
+            operation, result_key, not_found_code = BUCKET_PARTS[part]
+            try:
+                record[part] = getattr(s3, operation)(Bucket=name).get(result_key)
+            except botocore.exceptions.ClientError as e:
+                record[part] = None
+                if e.response['Error']['Code'] != not_found_code:
+                    record['Errors'][part] = e
+
+    # SNS
+    def sns_subscriptions(self):
+        return self._load('sns', 'list_subscriptions', 'Subscriptions')
+
+
+# AMIs are looked up by ID in batches and cached (per region) across inventories for IMAGE_CACHE_TTL seconds
+IMAGE_BATCH_SIZE = 100
+IMAGE_CACHE_TTL = 3600
+_image_cache = {}
+_image_cache_lock = threading.Lock()
+
+
+def lookup_images(ec2, region, image_ids):
+    """Return {image id: image} for image_ids, with None for images that no longer exist.
+
+    Uses the image-id filter rather than ImageIds=[...] so one deregistered AMI does not
+    fail the whole batch with InvalidAMIID.NotFound.
+    """
+    now = time.time()
+    found = {}
+    missing = []
+    with _image_cache_lock:
+        for image_id in set(image_ids):
+            cached = _image_cache.get((region, image_id))
+            if cached and cached[0] > now:
+                found[image_id] = cached[1]
+            else:
+                missing.append(image_id)
+    for start in range(0, len(missing), IMAGE_BATCH_SIZE):
+        batch = missing[start:start + IMAGE_BATCH_SIZE]
+        images = paginate(ec2, 'describe_images', 'Images', Filters=[{'Name' : 'image-id', 'Values' : batch}])
+        resolved = dict.fromkeys(batch)
+        resolved.update((image['ImageId'], image) for image in images)
+        with _image_cache_lock:
+            for image_id, image in resolved.items():
+                _image_cache[(region, image_id)] = (now + IMAGE_CACHE_TTL, image)
+        found.update(resolved)
+    return found
+
+
+# Instance profile name -> roles, per account (the inventory's account key)
+_instance_profiles = {}
+_instance_profiles_lock = threading.Lock()
+
+_inventories = {}
+_inventories_lock = threading.Lock()
+_role_credentials = {}
+_role_credentials_lock = threading.Lock()
+
+
+def role_credentials(profile, role_arn, session_name='cis-checks'):
+    """Return cached, self-refreshing STS credentials for role_arn assumed from profile."""
+    key = (profile, role_arn)
+    with _role_credentials_lock:
+        if key not in _role_credentials:
+            sts = boto3.Session(profile_name=profile).client('sts')
+
+            def refresh():
+                creds = sts.assume_role(RoleArn=role_arn, RoleSessionName=session_name)['Credentials']
+                return {
+                    'access_key': creds['AccessKeyId'],
+                    'secret_key': creds['SecretAccessKey'],
+                    'token': creds['SessionToken'],
+                    'expiry_time': creds['Expiration'].isoformat(),
+                }
+
+            _role_credentials[key] = RefreshableCredentials.create_from_metadata(
+                metadata=refresh(), refresh_using=refresh, method='sts-assume-role')
+        return _role_credentials[key]
+
+
+def make_session(args, region):
+    """Return a new boto3 Session for args.profile (and args.role_arn, if set) in region."""
+    profile = None if args.profile == 'default' else args.profile
+    role_arn = getattr(args, 'role_arn', None)
+    if not role_arn:
+        return boto3.Session(profile_name=profile, region_name=region)
+    botocore_session = botocore.session.get_session()
+    botocore_session._credentials = role_credentials(profile, role_arn)
+    return boto3.Session(botocore_session=botocore_session, region_name=region)
+
+
+def get_inventory(args, region=None, session=None):
+    """Return the shared Inventory for the args account and region (Default: args.region), creating it on first use.
+
+    Each new Inventory gets its own boto3 Session unless one is passed in, as sessions
+    are not safe to share between threads.
+    """
+    region = region or args.region
+    account = (args.profile, getattr(args, 'role_arn', None))
+    key = account + (region,)
+    with _inventories_lock:
+        if key not in _inventories:
+            if session is None:
+                session = make_session(args, region)
+            _inventories[key] = Inventory(session, region, account)
+        return _inventories[key]
+
+
+def drop_inventories(args):
+    """Forget the inventories (and shared instance profiles) of the args account, freeing their snapshots."""
+    account = (args.profile, getattr(args, 'role_arn', None))
+    with _inventories_lock:
+        for key in [key for key in _inventories if key[:2] == account]:
+            del _inventories[key]
+    with _instance_profiles_lock:
+        _instance_profiles.pop(account, None)
+
+
+def enabled_regions(args):
+    """Return the names of all regions enabled for the args account, sorted."""
+    ec2 = make_session(args, args.region).client('ec2')
+    return sorted(r['RegionName'] for r in ec2.describe_regions()['Regions'])
@@ -0,0 +1,266 @@
+"""
+Objective: Runs all (or selected) cis-checks scripts against one shared inventory snapshot,
+so each resource type is described once per account/region for the whole audit.
+With --all-regions the checks run against every enabled region at the same time and the
+output is merged into one report. With --accounts-file the suite runs across many accounts
+(assuming a role in each) in a process pool.
+
+Technologies: python, boto3
+
+Related Documentation:
+    https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/ec2.html
+
+
+To run in Cloud 9 environment:
+    python3 filename
+OR
+    Run button from code editor
+
+Author: Brendan Tuckey
+File location: https://github.com/brendantuckey/aws-code-snippets/blob/latest/boto3/cis-checks
+Updated: 10/18/2026
+
+"""
+
+#!/usr/bin/python3
+import os
+import io
+import sys
+import copy
+import glob
+import argparse
+import threading
+import contextlib
+import importlib.util
+import traceback
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import cis_inventory
+
+ARG_HELP = """
+########################## run-cis-checks.py ##############################
+### Runs the ac7-* audit checks in this folder against a single shared
+### inventory snapshot (one describe call per resource type).
+###
+###
+### Usage:
+### python run-cis-checks.py --profile <acct profile name> --region <AWS region name> [--checks ac7-6-4 ac7-7-1]
+### python run-cis-checks.py --profile <acct profile name> --all-regions [--max-workers 8]
+### python run-cis-checks.py --profile <org profile name> --accounts-file accounts.txt [--role-name <role>] [--max-accounts 4]
+###
+### accounts.txt has one account per line: "<account id>,<role arn>" or just
+### "<account id>" when --role-name is given. Lines starting with # are ignored.
+###
+###############################################################################
+"""
+
+CHECKS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# IAM and S3 checks look at global resources, so with --all-regions they only run in --region
+GLOBAL_CHECKS = ('ac7-3-', 'ac7-12-')
+
+# The checks only print their results, in no common format ("FAIL: ...", "INGRESS RULE
+# FAILED. ..."), so the summary counts the report lines mentioning FAIL as an estimate
+FAIL_MARKER = 'FAIL'
+
+
+class ThreadOutput(io.TextIOBase):
+    """sys.stdout replacement that sends print() output to a per-thread buffer when one is set.
+
+    The checks print their results, so this lets each region worker capture its own
+    report without the output of concurrent regions interleaving.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+
+    def capture(self):
+        self.local.buffer = io.StringIO()
+
+    def release(self):
+        buffer = self.local.buffer
+        self.local.buffer = None
+        return buffer.getvalue()
+
+    def write(self, text):
+        buffer = getattr(self.local, 'buffer', None)
+        return (buffer or self.stream).write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+def load_checks(selected=None):
+    """Import every ac7-*.py check in this folder (optionally only the selected ones).
+
+    A selection matches a check name or a whole leading part of it: ac7-11-1 selects
+    ac7-11-1 (not ac7-11-10) and ac7-11 selects every ac7-11-* check.
+    """
+    checks = []
+    for path in sorted(glob.glob(os.path.join(CHECKS_DIR, 'ac7-*.py'))):
+        name = os.path.basename(path)[:-3]
+        if selected and not any(name == prefix or name.startswith(prefix + '-') for prefix in selected):
+            continue
+        spec = importlib.util.spec_from_file_location(name.replace('-', '_'), path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        checks.append((name, module))
+    return checks
+
+
+def fail_lines(report):
+    """Estimate the failures in a captured report: the number of lines mentioning FAIL."""
+    return sum(1 for line in report.splitlines() if FAIL_MARKER in line)
+
+
+def run_checks(args, checks, inventory):
+    """Run the checks against one inventory, returning how many ran."""
+    for name, module in checks:
+        print(module.ARG_HELP)
+        try:
+            module.main(args, inventory)
+        except Exception as e:
+            print("Check %s exception: %s" % (name, e))
+            traceback.print_exc(file=sys.stdout)
+        print("=" * 80)
+    return len(checks)
+
+
+def run_region(args, checks, region, output):
+    """Run the checks against one region, returning (region, captured report, checks run, describe call count)."""
+    output.capture()
+    checks_run = api_calls = 0
+    try:
+        print("Running checks on account: %s in region %s...\n\n" % (getattr(args, 'role_arn', None) or args.profile, region))
+        inventory = cis_inventory.get_inventory(args, region)
+        if region != args.region:
+            checks = [(name, module) for name, module in checks if not name.startswith(GLOBAL_CHECKS)]
+        checks_run = run_checks(args, checks, inventory)
+        api_calls = inventory.api_calls
+    except Exception as e:
+        print("Region %s exception: %s" % (region, e))
+        traceback.print_exc(file=sys.stdout)
+    return region, output.release(), checks_run, api_calls
+
+
+def run_all_regions(args, checks):
+    regions = cis_inventory.enabled_regions(args)
+    output = ThreadOutput(sys.stdout)
+    sys.stdout = output
+    try:
+        with ThreadPoolExecutor(max_workers=args.max_workers) as executor:
+            futures = [executor.submit(run_region, args, checks, region, output) for region in regions]
+            results = [future.result() for future in futures]
+    finally:
+        sys.stdout = output.stream
+    return results
+
+
+def audit(args, checks):
+    """Run the checks for one account (in --region or all regions) and print the report."""
+    if args.all_regions:
+        results = run_all_regions(args, checks)
+        for region, report, checks_run, api_calls in results:
+            print("#" * 80)
+            print("### Region %s" % region)
+            print("#" * 80)
+            print(report)
+        print("Summary (lines mentioning FAIL, an estimate of the failures):")
+        for region, report, checks_run, api_calls in results:
+            print("\t%s: %d checks, ~%d FAIL line(s), %d inventory describe calls"
+                  % (region, checks_run, fail_lines(report), api_calls))
+        # Global checks only run in --region, so the per-region counts differ
+        print("Ran %d checks in total across %d regions." % (sum(result[2] for result in results), len(results)))
+    else:
+        inventory = cis_inventory.get_inventory(args)
+        checks_run = run_checks(args, checks, inventory)
+        print("Ran %d checks using %d inventory describe calls." % (checks_run, inventory.api_calls))
+
+
+def read_accounts(path, role_name=None):
+    """Return [(account id, role arn)] from an accounts file."""
+    accounts = []
+    with open(path) as accounts_file:
+        for line in accounts_file:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            fields = [field.strip() for field in line.split(',')]
+            if len(fields) > 1 and fields[1]:
+                accounts.append((fields[0], fields[1]))
+            elif role_name:
+                accounts.append((fields[0], "arn:aws:iam::%s:role/%s" % (fields[0], role_name)))
+            else:
+                raise ValueError("No role ARN for account %s and no --role-name given" % fields[0])
+    return accounts
+
+
+def run_account(args, account, role_arn):
+    """Process pool worker: audit one account and return (account, captured report)."""
+    args = copy.copy(args)
+    args.role_arn = role_arn
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        try:
+            print("Running checks on account %s using role %s..." % (account, role_arn))
+            audit(args, load_checks(args.checks))
+        except Exception as e:
+            print("Account %s exception: %s" % (account, e))
+            traceback.print_exc(file=sys.stdout)
+        finally:
+            # Pool processes are reused for other accounts, so do not keep this one's snapshots
+            cis_inventory.drop_inventories(args)
+    return account, output.getvalue()
+
+
+def run_accounts(args):
+    accounts = read_accounts(args.accounts_file, args.role_name)
+    summary = []
+    with ProcessPoolExecutor(max_workers=args.max_accounts) as executor:
+        futures = [executor.submit(run_account, args, account, role_arn) for account, role_arn in accounts]
+        # Reports are printed in accounts file order as soon as each one is ready
+        for future in futures:
+            account, report = future.result()
+            print("#" * 80)
+            print("### Account %s" % account)
+            print("#" * 80)
+            print(report)
+            summary.append((account, fail_lines(report), "exception:" in report))
+    print("Summary (lines mentioning FAIL, an estimate of the failures):")
+    for account, fails, error in summary:
+        print("\t%s: ~%d FAIL line(s)%s" % (account, fails, " (errors, see report)" if error else ""))
+    print("Audited %d accounts." % len(summary))
+
+
+def main(args):
+    if args.accounts_file:
+        run_accounts(args)
+    else:
+        audit(args, load_checks(args.checks))
+
+
+if __name__ == '__main__':
+    try:
+        args = argparse.ArgumentParser(description=ARG_HELP, formatter_class=argparse.RawTextHelpFormatter, usage=argparse.SUPPRESS)
+        args.add_argument('--region','-r', default='us-east-1', help="AWS region name (Default: us-east-1)")
+        args.add_argument('--profile','-p', dest='profile', type=str, default="default", help="Profile to use (Default: default)")
+        args.add_argument('--checks','-c', nargs='*', help="Only run these checks, eg. ac7-11-1 or ac7-11 for all ac7-11-* checks (Default: all)")
+        args.add_argument('--all-regions','-a', dest='all_regions', action='store_true', help="Run the checks against every enabled region")
+        args.add_argument('--max-workers','-w', dest='max_workers', type=int, default=8, help="Regions to check at the same time with --all-regions (Default: 8)")
+        args.add_argument('--accounts-file','-f', dest='accounts_file', help="File of accounts (and role ARNs) to audit")
+        args.add_argument('--role-name', dest='role_name', help="Role to assume in each account of --accounts-file without a role ARN")
+        args.add_argument('--max-accounts', dest='max_accounts', type=int, default=4, help="Accounts to audit at the same time with --accounts-file (Default: 4)")
+        args.add_argument('--verbose','-v', dest='verbose', action='store_true', help="Show verbose output of program")
+        args = args.parse_args()
+        print(ARG_HELP)
+        if args.accounts_file:
+            print("Running checks on accounts in %s...\n\n" % args.accounts_file)
+        elif args.all_regions:
+            print("Running checks on account: %s in all enabled regions...\n\n" % args.profile)
+        else:
+            print("Running checks on account: %s in region %s...\n\n" % (args.profile, args.region))
+        # Launch Main
+        main(args)
+    except Exception as e:
+        print("Main exception: ", e)
+        traceback.print_exc()
@@ -13,15 +13,18 @@ OR
 
 Author: Brendan Tuckey
 File location: https://github.com/brendantuckey/aws-code-snippets/blob/latest/boto3/dynamodb
-Updated: 3/24/2024
+Updated: 10/18/2026
+
+The movie is dropped from the shared read cache (dynamodb_cache.movies) once written.
 """
 #!/usr/bin/python3
 from pprint import pprint
-import boto3
+import dynamodb_cache
+import dynamodb_limiter
 
 def put_movie(title, year, plot, rating, dynamodb=None):
     if not dynamodb:
-        dynamodb = boto3.resource('dynamodb')
+        dynamodb = dynamodb_limiter.resource()
 
     table = dynamodb.Table('Movies')
     response = table.put_item(
@@ -34,6 +37,7 @@ def put_movie(title, year, plot, rating, dynamodb=None):
             }
         }
     )
+    dynamodb_cache.movies.invalidate((year, title))
     return response
 
 if __name__ == '__main__':
@@ -13,17 +13,20 @@ OR
 
 Author: Brendan Tuckey
 File location: https://github.com/brendantuckey/aws-code-snippets/blob/latest/boto3/dynamodb
-Updated: 3/24/2024
+Updated: 10/18/2026
+
+The movie is dropped from the shared read cache (dynamodb_cache.movies) once deleted.
 """
 #!/usr/bin/python3
 from decimal import Decimal
 from pprint import pprint
-import boto3
 from botocore.exceptions import ClientError
+import dynamodb_cache
+import dynamodb_limiter
 
 def delete_underrated_movie(title, year, rating, dynamodb=None):
     if not dynamodb:
-        dynamodb = boto3.resource('dynamodb')
+        dynamodb = dynamodb_limiter.resource()
 
     table = dynamodb.Table('Movies')
     try:
@@ -41,6 +44,7 @@ def delete_underrated_movie(title, year, rating, dynamodb=None):
         else:
             raise
     else:
+        dynamodb_cache.movies.invalidate((year, title))
         return response
 
 if __name__ == '__main__':
@@ -13,15 +13,15 @@ OR
 
 Author: Brendan Tuckey
 File location: https://github.com/brendantuckey/aws-code-snippets/blob/latest/boto3/dynamodb
-Updated: 3/24/2024
+Updated: 10/18/2026
 """
 
 #!/usr/bin/python3
-import boto3
+import dynamodb_limiter
 
 def delete_table(table_name, dynamodb=None):
     if not dynamodb:
-        dynamodb = boto3.resource('dynamodb')
+        dynamodb = dynamodb_limiter.resource()
     table = dynamodb.Table(table_name)
     table.delete()
 
@@ -0,0 +1,95 @@
+"""
+Exports every item of the dynamodb table named Movies to a JSON Lines or CSV file
+
+The table is read with a parallel segmented scan (one thread per segment) and the
+pages are written as they arrive, so memory use does not depend on the table size.
+Numbers are written as integers when they are integral and as floats otherwise.
+
+Technologies: python, boto3
+
+Related Boto3 Documentation:
+    https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/dynamodb/client/scan.html
+
+To run in Cloud 9 environment:
+    python3 filename
+OR
+    Run button from code editor
+
+Author: Brendan Tuckey
+File location: https://github.com/brendantuckey/aws-code-snippets/blob/latest/boto3/dynamodb
+Updated: 10/18/2026
+
+Usage:
+    python3 boto3-dynamodb-export-table.py [--output movies.jsonl] [--segments 8] [--attributes year title info.rating]
+    python3 boto3-dynamodb-export-table.py --format csv --output movies.csv --attributes year title info.rating
+
+--attributes only reads the given attribute paths (ProjectionExpression); CSV output
+has one column per attribute path, so --format csv needs --attributes.
+"""
+
+#!/usr/bin/python3
+import csv
+import json
+import time
+import argparse
+import dynamodb_bulk
+import dynamodb_limiter
+
+def attribute_value(item, path):
+    """Look up an attribute path like 'info.rating' in an item, None if it is missing."""
+    for name in path.split('.'):
+        if not isinstance(item, dict) or name not in item:
+            return None
+        item = item[name]
+    return item
+
+def write_jsonl(pages, output_file):
+    count = 0
+    for page in pages:
+        for item in page:
+            output_file.write(json.dumps(item, default=dynamodb_bulk.plain_value) + '\n')
+        count += len(page)
+    return count
+
+def write_csv(pages, output_file, attributes):
+    writer = csv.writer(output_file)
+    writer.writerow(attributes)
+    count = 0
+    for page in pages:
+        for item in page:
+            row = []
+            for path in attributes:
+                value = attribute_value(item, path)
+                if value is None or isinstance(value, str):
+                    row.append(value)
+                else:
+                    # Numbers as plain numbers, maps and lists as JSON text
+                    row.append(json.dumps(value, default=dynamodb_bulk.plain_value))
+            writer.writerow(row)
+        count += len(page)
+    return count
+
+def export_movies(output_file, file_format='jsonl', attributes=None, segments=dynamodb_bulk.SCAN_SEGMENTS, client=None):
+    # A low-level client: a resource's meta.client would deserialize the items a second time
+    if not client:
+        client = dynamodb_limiter.client()
+
+    scan_kwargs = dynamodb_bulk.projection(attributes) if attributes else {}
+    pages = dynamodb_bulk.parallel_scan(client, 'Movies', segments, **scan_kwargs)
+    if file_format == 'csv':
+        return write_csv(pages, output_file, attributes)
+    return write_jsonl(pages, output_file)
+
+if __name__ == '__main__':
+    args = argparse.ArgumentParser(description="Export the Movies table to a JSON Lines or CSV file")
+    args.add_argument('--output','-o', default="movies.jsonl", help="File to write (Default: movies.jsonl)")
+    args.add_argument('--format', dest='file_format', choices=('jsonl', 'csv'), default='jsonl', help="Output format (Default: jsonl)")
+    args.add_argument('--attributes','-a', nargs='+', help="Only export these attribute paths, eg. year title info.rating (Default: all)")
+    args.add_argument('--segments','-s', type=int, default=dynamodb_bulk.SCAN_SEGMENTS, help="Scan segments read at the same time (Default: %d)" % dynamodb_bulk.SCAN_SEGMENTS)
+    args = args.parse_args()
+    if args.file_format == 'csv' and not args.attributes:
+        raise SystemExit("--format csv needs --attributes")
+    start = time.time()
+    with open(args.output, 'w', newline='') as output_file:
+        count = export_movies(output_file, args.file_format, args.attributes, args.segments)
+    print("Exported %d movies to %s in %.1f seconds" % (count, args.output, time.time() - start))
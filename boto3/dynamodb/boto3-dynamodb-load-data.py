@@ -13,17 +13,26 @@ OR
 
 Author: Brendan Tuckey
 File location: https://github.com/brendantuckey/aws-code-snippets/blob/latest/boto3/dynamodb
-Updated: 3/24/2024
+Updated: 10/18/2026
+
+Usage:
+    python3 boto3-dynamodb-load-data.py [--file moviedata.json] [--bulk [--workers 8]]
+
+--bulk writes the movies with 25 item BatchWriteItem requests from several threads
+instead of one put_item call per movie (see dynamodb_bulk.py).
+--file may hold a JSON array of movies or JSON Lines (one movie per line); it is read
+one movie at a time, so large exports are never loaded into memory as a whole.
 """
 
 #!/usr/bin/python3
-from decimal import Decimal
-import json
-import boto3
+import time
+import argparse
+import dynamodb_bulk
+import dynamodb_limiter
 
 def load_movies(movies, dynamodb=None):
     if not dynamodb:
-        dynamodb = boto3.resource('dynamodb')
+        dynamodb = dynamodb_limiter.resource()
 
     table = dynamodb.Table('Movies')
     for movie in movies:
@@ -32,7 +41,25 @@ def load_movies(movies, dynamodb=None):
         print("Adding movie:", year, title)
         table.put_item(Item=movie)
 
+def bulk_load_movies(movies, client=None, workers=dynamodb_bulk.WRITE_WORKERS):
+    # A low-level client: a resource's meta.client would serialize the items a second time
+    if not client:
+        client = dynamodb_limiter.client()
+
+    start = time.time()
+    count = dynamodb_bulk.batch_write(client, movies, 'Movies', workers)
+    print("Loaded %d movies in %.1f seconds" % (count, time.time() - start))
+    return count
+
 if __name__ == '__main__':
-    with open("moviedata.json") as json_file:
-        movie_list = json.load(json_file, parse_float=Decimal)
-        load_movies(movie_list)
+    args = argparse.ArgumentParser(description="Load movies from a json file into the Movies table")
+    args.add_argument('--file','-f', default="moviedata.json", help="JSON array or JSON Lines file of movies (Default: moviedata.json)")
+    args.add_argument('--bulk','-b', action='store_true', help="Load with batched writes from several threads")
+    args.add_argument('--workers','-w', type=int, default=dynamodb_bulk.WRITE_WORKERS, help="Writer threads with --bulk (Default: %d)" % dynamodb_bulk.WRITE_WORKERS)
+    args = args.parse_args()
+    with open(args.file) as json_file:
+        movies = dynamodb_bulk.iter_json_items(json_file)
+        if args.bulk:
+            bulk_load_movies(movies, workers=args.workers)
+        else:
+            load_movies(movies)
@@ -0,0 +1,69 @@
+"""
+Deletes every movie rated at or below a rating from the dynamodb table named Movies
+
+The bulk version of delete_underrated_movie(): a parallel segmented scan with a
+FilterExpression on info.rating reads only the keys of matching movies and streams
+them to a pool of delete workers. Each delete keeps the condition
+"info.rating <= :val", so a movie re-rated after it was scanned is not deleted; the
+conditional deletes are sent 100 at a time with TransactWriteItems. With
+--unconditional plain 25 key BatchWriteItem requests are used instead.
+
+Technologies: python, boto3
+
+Related Boto3 Documentation:
+    https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/dynamodb/client/transact_write_items.html
+
+To run in Cloud 9 environment:
+    python3 filename
+OR
+    Run button from code editor
+
+Author: Brendan Tuckey
+File location: https://github.com/brendantuckey/aws-code-snippets/blob/latest/boto3/dynamodb
+Updated: 10/18/2026
+
+Usage:
+    python3 boto3-dynamodb-purge-items.py --rating 5 [--segments 8] [--workers 8] [--unconditional]
+"""
+
+#!/usr/bin/python3
+from decimal import Decimal
+import time
+import argparse
+import dynamodb_bulk
+import dynamodb_cache
+import dynamodb_limiter
+
+def purge_underrated_movies(rating, client=None, segments=dynamodb_bulk.SCAN_SEGMENTS,
+                            workers=dynamodb_bulk.WRITE_WORKERS, conditional=True):
+    # A low-level client: a resource's meta.client would (de)serialize the items a second time
+    if not client:
+        client = dynamodb_limiter.client()
+
+    values = dynamodb_bulk.serialize({':val': Decimal(rating)})
+    pages = dynamodb_bulk.parallel_scan(
+        client, 'Movies', segments,
+        ProjectionExpression="#yr, title",
+        FilterExpression="info.rating <= :val",
+        ExpressionAttributeNames={'#yr': 'year'},
+        ExpressionAttributeValues=values)
+    keys = (key for page in pages for key in page)
+    condition = None
+    if conditional:
+        condition = {'ConditionExpression': "info.rating <= :val", 'ExpressionAttributeValues': values}
+    try:
+        return dynamodb_bulk.batch_delete(client, keys, 'Movies', workers, condition=condition)
+    finally:
+        dynamodb_cache.movies.clear()
+
+if __name__ == '__main__':
+    args = argparse.ArgumentParser(description="Delete every movie rated at or below --rating")
+    args.add_argument('--rating','-r', type=str, required=True, help="Delete movies with info.rating at or below this")
+    args.add_argument('--segments','-s', type=int, default=dynamodb_bulk.SCAN_SEGMENTS, help="Scan segments read at the same time (Default: %d)" % dynamodb_bulk.SCAN_SEGMENTS)
+    args.add_argument('--workers','-w', type=int, default=dynamodb_bulk.WRITE_WORKERS, help="Delete threads (Default: %d)" % dynamodb_bulk.WRITE_WORKERS)
+    args.add_argument('--unconditional', action='store_true', help="Delete without re-checking the rating (BatchWriteItem instead of transactions)")
+    args = args.parse_args()
+    start = time.time()
+    deleted = purge_underrated_movies(args.rating, segments=args.segments, workers=args.workers,
+                                      conditional=not args.unconditional)
+    print("Deleted %d movies rated at or below %s in %.1f seconds" % (deleted, args.rating, time.time() - start))
@@ -1,5 +1,5 @@
 """
-Gets an item from the dynamodb table named Movies
+Gets an item (or many items) from the dynamodb table named Movies
 
 Technologies: python, boto3
 
@@ -13,17 +13,29 @@ OR
 
 Author: Brendan Tuckey
 File location: https://github.com/brendantuckey/aws-code-snippets/blob/latest/boto3/dynamodb
-Updated: 3/24/2024
+Updated: 10/18/2026
+
+get_movies() looks up many movies at once with 100 key BatchGetItem requests sent
+from several threads (see dynamodb_bulk.py) instead of one get_item call per movie.
+get_movie(..., cache=dynamodb_cache.movies) reads through an in-process LRU/TTL cache
+(see dynamodb_cache.py); a movie that is not found is returned as None and cached too.
 """
 
 #!/usr/bin/python3
 from pprint import pprint
-import boto3
 from botocore.exceptions import ClientError
+import dynamodb_bulk
+import dynamodb_cache
+import dynamodb_limiter
+
+def get_movie(title, year, dynamodb=None, cache=None):
+    if cache is not None:
+        found, movie, generation = cache.get((year, title))
+        if found:
+            return movie
 
-def get_movie(title, year, dynamodb=None):
     if not dynamodb:
-        dynamodb = boto3.resource('dynamodb')
+        dynamodb = dynamodb_limiter.resource()
 
     table = dynamodb.Table('Movies')
     try:
@@ -31,11 +43,29 @@ def get_movie(title, year, dynamodb=None):
     except ClientError as e:
         print(e.response['Error']['Message'])
     else:
-        return response['Item']
+        movie = response.get('Item')
+        if cache is not None:
+            cache.put((year, title), movie, generation)
+        return movie
+
+def get_movies(keys, client=None, workers=dynamodb_bulk.READ_WORKERS):
+    """Get the movies for a list of (title, year) keys, in the same order (None if not found).
+
+    client is a low-level dynamodb client (Default: dynamodb_limiter.client()); a
+    resource's meta.client would serialize the keys a second time.
+    """
+    if not client:
+        client = dynamodb_limiter.client()
+
+    try:
+        return dynamodb_bulk.batch_get(
+            client, [{'year': year, 'title': title} for title, year in keys], 'Movies', workers)
+    except ClientError as e:
+        print(e.response['Error']['Message'])
 
 
 if __name__ == '__main__':
-    movie = get_movie("The Big New Movie", 2015)
+    movie = get_movie("The Big New Movie", 2015, cache=dynamodb_cache.movies)
     if movie:
         print("Get movie succeeded:")
         pprint(movie, sort_dicts=False)
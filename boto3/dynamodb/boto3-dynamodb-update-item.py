@@ -13,17 +13,25 @@ OR
 
 Author: Brendan Tuckey
 File location: https://github.com/brendantuckey/aws-code-snippets/blob/latest/boto3/dynamodb
-Updated: 3/24/2024
+Updated: 10/18/2026
+
+The movie is dropped from the shared read cache (dynamodb_cache.movies) once updated.
+
+For bursty update traffic, movie_updater() returns a dynamodb_bulk.BufferedUpdater:
+update_movie_buffered() calls to the same movie within the window are merged into a
+single UpdateItem, and different movies are written in parallel.
 """
 
 #!/usr/bin/python3
 from decimal import Decimal
 from pprint import pprint
-import boto3
+import dynamodb_bulk
+import dynamodb_cache
+import dynamodb_limiter
 
 def update_movie(title, year, rating, plot, actors, dynamodb=None):
     if not dynamodb:
-        dynamodb = boto3.resource('dynamodb')
+        dynamodb = dynamodb_limiter.resource()
 
     table = dynamodb.Table('Movies')
     response = table.update_item(
@@ -37,8 +45,22 @@ def update_movie(title, year, rating, plot, actors, dynamodb=None):
             ':a': actors },
         ReturnValues="UPDATED_NEW"# "UPDATED_OLD" would return the previous values in the update_response
     )
+    dynamodb_cache.movies.invalidate((year, title))
     return response
 
+def movie_updater(client=None, window=dynamodb_bulk.UPDATE_WINDOW, workers=dynamodb_bulk.UPDATE_WORKERS):
+    # A low-level client: a resource's meta.client would serialize the updates a second time
+    if not client:
+        client = dynamodb_limiter.client()
+
+    return dynamodb_bulk.BufferedUpdater(client, 'Movies', window, workers,
+                                         on_flush=dynamodb_cache.movies.invalidate)
+
+def update_movie_buffered(updater, title, year, rating, plot, actors):
+    updater.set(
+        {'year': year, 'title': title},
+        {'info.rating': Decimal(rating), 'info.plot': plot, 'info.actors': actors})
+
 if __name__ == '__main__':
     update_response = update_movie(
         "The Big New Movie", 2015, 5.5, "Everything happens all at once.",
@@ -0,0 +1,536 @@
+"""
+Objective: Bulk helpers for the dynamodb Movies table scripts
+
+batch_write() groups items into 25 item BatchWriteItem requests and retries any
+UnprocessedItems with exponential backoff. Several writer threads run at the same
+time; items are partitioned by key, so every write to a key is made by the same
+thread in input order and the last item for a key wins, as with one put_item per item.
+
+iter_json_items() streams the items of a top-level JSON array or of a JSON Lines file
+one at a time (floats parsed as Decimal), and batch_write() feeds its writer threads
+through bounded queues, so memory use stays flat however large the input file is.
+
+batch_get() looks up many keys with 100 key BatchGetItem requests sent from several
+threads, retrying UnprocessedKeys with backoff, and returns the items in key order.
+
+batch_delete() deletes a stream of keys the same way: with 25 key BatchWriteItem
+requests, or, when each delete has a condition, with 100 action TransactWriteItems
+requests (keys whose condition no longer holds are dropped and the rest retried).
+
+BufferedUpdater coalesces SET updates per key within a time window and writes each
+key's merged updates with a single UpdateItem, flushing different keys in parallel.
+
+parallel_scan() reads the whole table with a segmented Scan (Segment/TotalSegments),
+one thread per segment, and yields the pages through a bounded queue as they arrive.
+
+Technologies: python, boto3
+
+Related Boto3 Documentation:
+    https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/dynamodb/client/batch_write_item.html
+
+Author: Brendan Tuckey
+File location: https://github.com/brendantuckey/aws-code-snippets/blob/latest/boto3/dynamodb
+Updated: 10/18/2026
+"""
+
+import json
+import time
+import queue
+import random
+import base64
+import threading
+from decimal import Decimal
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from boto3.dynamodb.types import TypeSerializer, TypeDeserializer, Binary
+from botocore.exceptions import ClientError
+
+TABLE_NAME = 'Movies'
+KEY_NAMES = ('year', 'title')
+
+BATCH_WRITE_SIZE = 25  # BatchWriteItem limit
+TRANSACT_SIZE = 100  # TransactWriteItems limit
+WRITE_WORKERS = 8
+QUEUE_SIZE = 1000  # items waiting per writer thread
+
+READ_SIZE = 1024 * 1024  # characters read from a JSON file at a time
+
+BATCH_GET_SIZE = 100  # BatchGetItem limit
+READ_WORKERS = 8
+
+SCAN_SEGMENTS = 8
+
+UPDATE_WINDOW = 1.0  # seconds updates to a key are buffered for
+UPDATE_WORKERS = 8
+
+# Retries of unprocessed items: full jitter backoff from BACKOFF_BASE up to BACKOFF_MAX seconds
+MAX_ATTEMPTS = 10
+BACKOFF_BASE = 0.05
+BACKOFF_MAX = 5
+
+_serializer = TypeSerializer()
+_deserializer = TypeDeserializer()
+_DONE = object()  # end of a writer queue
+
+
+def iter_json_items(json_file, read_size=READ_SIZE):
+    """Yield the items of a top-level JSON array, or of JSON Lines, one at a time with floats as Decimal."""
+    decoder = json.JSONDecoder(parse_float=Decimal)
+    buffer = ''
+    position = 0
+    in_array = None
+    eof = False
+    while True:
+        # Skip whitespace (and, inside an array, the separating commas)
+        while position < len(buffer) and (buffer[position].isspace() or (in_array and buffer[position] == ',')):
+            position += 1
+        if position < len(buffer):
+            if in_array is None:
+                in_array = buffer[position] == '['
+                if in_array:
+                    position += 1
+                continue
+            if in_array and buffer[position] == ']':
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                # A value that ends with the buffer (eg. a number) may continue in the next read
+                if end < len(buffer) or eof:
+                    yield item
+                    position = end
+                    continue
+        elif eof:
+            if in_array:
+                raise ValueError("Unterminated JSON array")
+            return
+        data = json_file.read(read_size)
+        eof = not data
+        buffer = buffer[position:] + data
+        position = 0
+
+
+def backoff(attempt):
+    time.sleep(random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt)))
+
+
+def serialize(item):
+    """Convert a plain item (Decimal numbers, as the resource API takes) to DynamoDB attribute values."""
+    return {name: _serializer.serialize(value) for name, value in item.items()}
+
+
+def deserialize(item):
+    """Convert DynamoDB attribute values back to a plain item (the inverse of serialize)."""
+    return {name: _deserializer.deserialize(value) for name, value in item.items()}
+
+
+def plain_value(value):
+    """json.dumps default= for deserialized items.
+
+    Numbers become int when they are integral and float otherwise, sets become sorted
+    lists and binary values base64 strings.
+    """
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    if isinstance(value, Binary):
+        return base64.b64encode(value.value).decode('ascii')
+    raise TypeError("%r is not JSON serializable" % (value,))
+
+
+def projection(attributes):
+    """Return Scan/Query arguments that only read the given attribute paths (eg. 'year', 'info.rating').
+
+    Every name is replaced by a placeholder, as names like year are reserved words.
+    """
+    names = {}
+    paths = [_path_placeholder(attribute, names) for attribute in attributes]
+    return {
+        'ProjectionExpression': ', '.join(paths),
+        'ExpressionAttributeNames': {placeholder: name for name, placeholder in names.items()},
+    }
+
+
+def update_expression(values):
+    """Return UpdateItem arguments that SET each attribute path in values to its value."""
+    names = {}
+    assignments = []
+    attribute_values = {}
+    for i, (path, value) in enumerate(values.items()):
+        assignments.append('%s = :v%d' % (_path_placeholder(path, names), i))
+        attribute_values[':v%d' % i] = _serializer.serialize(value)
+    return {
+        'UpdateExpression': 'SET ' + ', '.join(assignments),
+        'ExpressionAttributeNames': {placeholder: name for name, placeholder in names.items()},
+        'ExpressionAttributeValues': attribute_values,
+    }
+
+
+def _path_placeholder(path, names):
+    # Every name is replaced by a #p<n> placeholder, reusing the ones already in names
+    return '.'.join(names.setdefault(name, '#p%d' % len(names)) for name in path.split('.'))
+
+
+def item_key(item, key_names=KEY_NAMES):
+    return tuple(item[name] for name in key_names)
+
+
+def write_batch(client, table_name, requests):
+    """Send one BatchWriteItem request, retrying UnprocessedItems with backoff."""
+    request_items = {table_name: requests}
+    for attempt in range(MAX_ATTEMPTS):
+        response = client.batch_write_item(RequestItems=request_items)
+        request_items = response.get('UnprocessedItems')
+        if not request_items:
+            return
+        backoff(attempt)
+    raise RuntimeError("%d write request(s) for %s still unprocessed after %d attempts"
+                       % (len(request_items.get(table_name, [])), table_name, MAX_ATTEMPTS))
+
+
+def write_partition(client, table_name, items, key_names=KEY_NAMES):
+    """Put items 25 at a time and return the number of items written.
+
+    A batch may not hold two requests for the same key, so a later item for a key
+    already in the pending batch replaces it.
+    """
+    batch = {}
+    written = 0
+    for item in items:
+        batch[item_key(item, key_names)] = {'PutRequest': {'Item': serialize(item)}}
+        written += 1
+        if len(batch) == BATCH_WRITE_SIZE:
+            write_batch(client, table_name, list(batch.values()))
+            batch = {}
+    if batch:
+        write_batch(client, table_name, list(batch.values()))
+    return written
+
+
+def get_batch(client, table_name, keys, key_names=KEY_NAMES):
+    """Send one BatchGetItem request for key tuples, retrying UnprocessedKeys; returns {key tuple: item}."""
+    request_items = {table_name: {'Keys': [serialize(dict(zip(key_names, key))) for key in keys]}}
+    found = {}
+    for attempt in range(MAX_ATTEMPTS):
+        response = client.batch_get_item(RequestItems=request_items)
+        for item in response['Responses'].get(table_name, []):
+            item = deserialize(item)
+            found[item_key(item, key_names)] = item
+        request_items = response.get('UnprocessedKeys')
+        if not request_items:
+            return found
+        backoff(attempt)
+    raise RuntimeError("%d key(s) for %s still unprocessed after %d attempts"
+                       % (len(request_items[table_name]['Keys']), table_name, MAX_ATTEMPTS))
+
+
+def batch_get(client, keys, table_name=TABLE_NAME, workers=READ_WORKERS, key_names=KEY_NAMES):
+    """Get the items for keys (dicts of the key attributes) with workers threads.
+
+    Returns a list in the order of keys, with None for keys that have no item.
+    """
+    # A request may not hold the same key twice
+    unique = list(dict.fromkeys(item_key(key, key_names) for key in keys))
+    chunks = [unique[i:i + BATCH_GET_SIZE] for i in range(0, len(unique), BATCH_GET_SIZE)]
+    found = {}
+    if chunks:
+        with ThreadPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+            for chunk_found in executor.map(get_batch, [client] * len(chunks), [table_name] * len(chunks),
+                                            chunks, [key_names] * len(chunks)):
+                found.update(chunk_found)
+    return [found.get(item_key(key, key_names)) for key in keys]
+
+
+def delete_partition(client, table_name, keys, key_names=KEY_NAMES, condition=None):
+    """Delete keys (dicts of the key attributes) in batches and return the number deleted.
+
+    Without a condition the keys are deleted 25 at a time with BatchWriteItem. With a
+    condition ({'ConditionExpression': ..., 'ExpressionAttributeValues': ...} in client
+    format) they are deleted 100 at a time with TransactWriteItems.
+    """
+    batch_size = BATCH_WRITE_SIZE if condition is None else TRANSACT_SIZE
+    batch = {}
+    deleted = 0
+    for key in keys:
+        batch[item_key(key, key_names)] = serialize({name: key[name] for name in key_names})
+        if len(batch) == batch_size:
+            deleted += _delete_batch(client, table_name, list(batch.values()), condition)
+            batch = {}
+    if batch:
+        deleted += _delete_batch(client, table_name, list(batch.values()), condition)
+    return deleted
+
+
+def _delete_batch(client, table_name, keys, condition):
+    if condition is None:
+        write_batch(client, table_name, [{'DeleteRequest': {'Key': key}} for key in keys])
+        return len(keys)
+    return transact_delete(client, table_name, keys, condition)
+
+
+def transact_delete(client, table_name, keys, condition):
+    """Delete serialized keys in one transaction, each only if condition holds; returns the number deleted.
+
+    A transaction fails as a whole, so keys whose condition no longer holds are dropped
+    and the transaction is retried with the rest (with backoff for any other cancellation).
+    """
+    actions = [{'Delete': dict(condition, TableName=table_name, Key=key)} for key in keys]
+    for attempt in range(MAX_ATTEMPTS):
+        if not actions:
+            return 0
+        try:
+            client.transact_write_items(TransactItems=actions)
+            return len(actions)
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'TransactionCanceledException':
+                raise
+            reasons = e.response.get('CancellationReasons', [])
+            failed = {i for i, reason in enumerate(reasons) if reason.get('Code') == 'ConditionalCheckFailed'}
+            if failed:
+                actions = [action for i, action in enumerate(actions) if i not in failed]
+            else:
+                backoff(attempt)
+    raise RuntimeError("Transaction of %d delete(s) on %s still cancelled after %d attempts"
+                       % (len(actions), table_name, MAX_ATTEMPTS))
+
+
+def _drain_queue(items_queue, worker, failed):
+    items = iter(items_queue.get, _DONE)
+    try:
+        return worker(items)
+    except BaseException:
+        # Tell the reader to stop, and keep draining so it never blocks on this full queue
+        failed.set()
+        for item in items:
+            pass
+        raise
+
+
+def _fan_out(items, worker, workers, key_names):
+    # Runs worker(iterable) in workers threads, each fed through a bounded queue.
+    # Items are partitioned by key, so all items for a key go to one worker in order.
+    # Reading stops as soon as any worker fails; its exception is raised by result().
+    queues = [queue.Queue(maxsize=QUEUE_SIZE) for _ in range(workers)]
+    failed = threading.Event()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_drain_queue, items_queue, worker, failed) for items_queue in queues]
+        try:
+            for item in items:
+                if failed.is_set():
+                    break
+                queues[hash(item_key(item, key_names)) % workers].put(item)
+        finally:
+            for items_queue in queues:
+                items_queue.put(_DONE)
+        return sum(future.result() for future in futures)
+
+
+def batch_write(client, items, table_name=TABLE_NAME, workers=WRITE_WORKERS, key_names=KEY_NAMES):
+    """Write an iterable of items with workers threads (the boto3 client is thread safe).
+
+    Items are read as the writers need them, through one bounded queue per writer.
+    Returns the number of items written.
+    """
+    return _fan_out(items, lambda partition: write_partition(client, table_name, partition, key_names),
+                    workers, key_names)
+
+
+def batch_delete(client, keys, table_name=TABLE_NAME, workers=WRITE_WORKERS, key_names=KEY_NAMES, condition=None):
+    """Delete an iterable of keys (or items) with workers threads; see delete_partition() for condition.
+
+    Returns the number of items deleted.
+    """
+    return _fan_out(keys, lambda partition: delete_partition(client, table_name, partition, key_names, condition),
+                    workers, key_names)
+
+
+def scan_segment(client, table_name, segment, total_segments, pages, stop, **scan_kwargs):
+    """Scan one segment, putting each page of deserialized items on pages; returns the item count."""
+    request = dict(scan_kwargs, TableName=table_name, Segment=segment, TotalSegments=total_segments)
+    count = 0
+    while not stop.is_set():
+        response = client.scan(**request)
+        items = [deserialize(item) for item in response['Items']]
+        count += len(items)
+        pages.put(items)
+        if 'LastEvaluatedKey' not in response:
+            break
+        request['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    return count
+
+
+def _scan_queue(client, table_name, segment, total_segments, pages, stop, scan_kwargs):
+    try:
+        return scan_segment(client, table_name, segment, total_segments, pages, stop, **scan_kwargs)
+    except BaseException:
+        # Stop the other segments too, the scan has failed
+        stop.set()
+        raise
+    finally:
+        pages.put(_DONE)
+
+
+def parallel_scan(client, table_name=TABLE_NAME, segments=SCAN_SEGMENTS, **scan_kwargs):
+    """Scan the whole table with segments threads, yielding pages of items in the order they arrive.
+
+    scan_kwargs are passed to every Scan request (eg. projection(...), FilterExpression).
+    """
+    pages = queue.Queue(maxsize=segments * 2)
+    stop = threading.Event()
+    finished = 0
+    with ThreadPoolExecutor(max_workers=segments) as executor:
+        futures = [executor.submit(_scan_queue, client, table_name, segment, segments, pages, stop, scan_kwargs)
+                   for segment in range(segments)]
+        try:
+            while finished < segments:
+                page = pages.get()
+                if page is _DONE:
+                    finished += 1
+                    if stop.is_set():
+                        # A segment failed: its error is raised below
+                        break
+                else:
+                    yield page
+        finally:
+            # Stopped early (or a segment failed): let the remaining workers finish their put
+            stop.set()
+            while finished < segments:
+                if pages.get() is _DONE:
+                    finished += 1
+        for future in futures:
+            future.result()
+
+
+def merge_set(values, path, value):
+    """Add SET path = value to pending values, keeping the paths in values from overlapping.
+
+    A path under the new one is replaced by it; a new path under a pending map value
+    is set inside (a copy of) that value.
+    """
+    for pending in list(values):
+        if pending == path or pending.startswith(path + '.'):
+            del values[pending]
+        elif path.startswith(pending + '.'):
+            names = path[len(pending) + 1:].split('.')
+            parent = values[pending] = dict(values[pending])
+            for name in names[:-1]:
+                parent[name] = dict(parent.get(name) or {})
+                parent = parent[name]
+            parent[names[-1]] = value
+            return
+    values[path] = value
+
+
+class BufferedUpdater:
+    """Buffers SET updates per key and writes each key's merged updates with one UpdateItem.
+
+    The first update to a key starts its window; updates to the same key within it are
+    merged (later values win) and the key is written when the window ends. Keys are
+    written in parallel by workers threads, but never two writes for the same key at
+    once, so updates to a key are applied in order. on_flush(key tuple) is called after
+    each successful write (eg. to invalidate a cache).
+
+    Use as a context manager, or call close(), to write everything still buffered.
+    Write errors are collected and raised by flush() and close().
+    """
+
+    def __init__(self, client, table_name=TABLE_NAME, window=UPDATE_WINDOW, workers=UPDATE_WORKERS,
+                 key_names=KEY_NAMES, on_flush=None):
+        self.client = client
+        self.table_name = table_name
+        self.window = window
+        self.key_names = key_names
+        self.on_flush = on_flush
+        self.pending = OrderedDict()  # key tuple -> (write time, {path: value}), in write time order
+        self.in_flight = set()
+        self.errors = []
+        self.updates = 0  # set() calls
+        self.writes = 0  # UpdateItem calls
+        self.flushing = 0
+        self.closed = False
+        self.condition = threading.Condition()
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def set(self, key, values):
+        """Buffer SET updates ({attribute path: value}) for key (a dict of the key attributes)."""
+        key = item_key(key, self.key_names)
+        with self.condition:
+            if self.closed:
+                raise RuntimeError("BufferedUpdater is closed")
+            if key not in self.pending:
+                self.pending[key] = (time.monotonic() + self.window, {})
+                self.condition.notify_all()
+            pending_values = self.pending[key][1]
+            for path, value in values.items():
+                merge_set(pending_values, path, value)
+            self.updates += 1
+
+    def flush(self):
+        """Write everything buffered now and wait for it."""
+        with self.condition:
+            self.flushing += 1
+            self.condition.notify_all()
+            try:
+                self.condition.wait_for(lambda: not self.pending and not self.in_flight)
+            finally:
+                self.flushing -= 1
+            self._raise_errors()
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            with self.condition:
+                self.closed = True
+                self.condition.notify_all()
+            self.thread.join()
+            self.executor.shutdown()
+
+    def _raise_errors(self):
+        if self.errors:
+            errors, self.errors = self.errors, []
+            raise RuntimeError("%d update(s) failed, first for %s: %s" % (len(errors), errors[0][0], errors[0][1]))
+
+    def _run(self):
+        with self.condition:
+            while not self.closed:
+                now = time.monotonic()
+                timeout = None
+                for key, (write_time, values) in list(self.pending.items()):
+                    if write_time > now and not self.flushing:
+                        timeout = write_time - now
+                        break
+                    if key in self.in_flight:
+                        # Written when the earlier write for this key is done
+                        continue
+                    del self.pending[key]
+                    self.in_flight.add(key)
+                    self.executor.submit(self._write, key, values)
+                self.condition.wait(timeout)
+
+    def _write(self, key, values):
+        try:
+            self.client.update_item(TableName=self.table_name, Key=serialize(dict(zip(self.key_names, key))),
+                                    **update_expression(values))
+            if self.on_flush:
+                self.on_flush(key)
+        except Exception as e:
+            with self.condition:
+                self.errors.append((key, e))
+        finally:
+            with self.condition:
+                self.in_flight.discard(key)
+                self.writes += 1
+                self.condition.notify_all()
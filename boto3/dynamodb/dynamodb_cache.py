@@ -0,0 +1,89 @@
+"""
+Objective: In-process read-through cache for the dynamodb Movies table scripts
+
+TTLCache is a thread safe LRU cache whose entries expire after a TTL. Missing items
+(None) are cached too, for a shorter TTL, so repeated lookups of a key that does not
+exist do not reach DynamoDB either. When the cache is full the least recently used
+entry is evicted. Values are deep copied going in and coming out, so a caller changing
+the item it got back does not change what other callers read.
+
+movies is the cache shared by the scripts in this folder: get_movie(..., cache=movies)
+reads through it, and update_movie() and delete_underrated_movie() invalidate the
+keys they write, so cached reads stay correct for writes made through these scripts
+(writes made elsewhere are seen once the TTL expires).
+
+Technologies: python
+
+Author: Brendan Tuckey
+File location: https://github.com/brendantuckey/aws-code-snippets/blob/latest/boto3/dynamodb
+Updated: 10/18/2026
+"""
+
+import copy
+import time
+import threading
+from collections import OrderedDict
+
+CACHE_SIZE = 10000  # entries
+CACHE_TTL = 300  # seconds
+NEGATIVE_TTL = 30  # seconds a missing item is cached for
+
+
+class TTLCache:
+    """Thread safe LRU cache with a TTL, caching None (not found) for negative_ttl seconds."""
+
+    def __init__(self, max_size=CACHE_SIZE, ttl=CACHE_TTL, negative_ttl=NEGATIVE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.entries = OrderedDict()  # key -> (expiry time, value), least recently used first
+        self.lock = threading.Lock()
+        # Bumped by every invalidation, so a value loaded before a write is never cached after it
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        """Return (found, value, generation); pass generation to put() when caching a freshly loaded value."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self.entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return False, None, self.generation
+            self.entries.move_to_end(key)
+            self.hits += 1
+            generation = self.generation
+        # Cached values are never changed in place, so the copy can be made outside the lock
+        return True, copy.deepcopy(entry[1]), generation
+
+    def put(self, key, value, generation=None):
+        """Cache value for key, unless a key was invalidated since generation was read."""
+        ttl = self.negative_ttl if value is None else self.ttl
+        value = copy.deepcopy(value)
+        with self.lock:
+            if generation is not None and generation != self.generation:
+                return
+            self.entries[key] = (time.monotonic() + ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self.lock:
+            self.generation += 1
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.generation += 1
+            self.entries.clear()
+
+
+# Movies keyed (year, title)
+movies = TTLCache()
@@ -0,0 +1,206 @@
+"""
+Objective: Shared, rate limited dynamodb client for the Movies table scripts
+
+client() returns one cached, low-level boto3 dynamodb client per process, for the
+dynamodb_bulk helpers. Resources are not thread safe, so resource() returns a resource
+per thread. A resource registers boto3's item (de)serializers on its own client, so the
+two never share a client; instead one CapacityLimiter is registered, through botocore
+events, on the low-level client and on every resource's client. Every call made by
+these scripts (single item calls, the bulk loader, scans, updates and purges)
+therefore shares the same per-table token buckets:
+
+- each table gets a read and a write bucket, refilled at the table's provisioned
+  capacity (read with describe_table); on-demand tables are not limited
+- every request asks for ReturnConsumedCapacity and is charged what it actually
+  consumed, and new requests wait while a bucket is in debt
+- a ProvisionedThroughputExceededException (or other throttling error) cuts the
+  bucket's rate, which then grows back towards the provisioned capacity
+
+Technologies: python, boto3
+
+Related Boto3 Documentation:
+    https://boto3.amazonaws.com/v1/documentation/api/latest/guide/events.html
+
+Author: Brendan Tuckey
+File location: https://github.com/brendantuckey/aws-code-snippets/blob/latest/boto3/dynamodb
+Updated: 10/18/2026
+"""
+
+import json
+import time
+import threading
+import boto3
+from botocore.config import Config
+
+READ_OPERATIONS = ('GetItem', 'BatchGetItem', 'Query', 'Scan', 'TransactGetItems')
+WRITE_OPERATIONS = ('PutItem', 'UpdateItem', 'DeleteItem', 'BatchWriteItem', 'TransactWriteItems')
+THROTTLE_CODES = ('ProvisionedThroughputExceededException', 'ThrottlingException', 'RequestLimitExceeded')
+
+# On a throttle the rate is multiplied by RATE_DECREASE (at most once per DECREASE_INTERVAL
+# seconds, never below MIN_RATE_FRACTION of the capacity); it then grows back by
+# RATE_INCREASE of the capacity per second
+RATE_DECREASE = 0.7
+DECREASE_INTERVAL = 1.0
+MIN_RATE_FRACTION = 0.1
+RATE_INCREASE = 0.05
+
+MAX_POOL_CONNECTIONS = 50  # enough for the bulk helpers' reader, writer and scan threads
+MAX_ATTEMPTS = 10
+
+_client = None
+_limiter = None
+_client_lock = threading.Lock()
+_local = threading.local()  # this thread's resource
+
+
+class TokenBucket:
+    """Token bucket refilled at rate capacity units per second, holding at most one second of units.
+
+    Callers wait() while the bucket is empty and consume() what a request actually used
+    afterwards, so the bucket can go into debt; the next callers wait until it is repaid.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.rate = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.last_decrease = 0
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self.updated
+        self.updated = now
+        self.tokens = min(self.rate, self.tokens + elapsed * self.rate)
+        self.rate = min(self.capacity, self.rate + elapsed * self.capacity * RATE_INCREASE)
+
+    def wait(self):
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens > 0:
+                    return
+                delay = -self.tokens / self.rate + 0.01
+            time.sleep(delay)
+
+    def consume(self, units):
+        with self.lock:
+            self._refill()
+            self.tokens -= units
+
+    def throttled(self):
+        with self.lock:
+            self._refill()
+            now = time.monotonic()
+            if now - self.last_decrease >= DECREASE_INTERVAL:
+                self.rate = max(self.capacity * MIN_RATE_FRACTION, self.rate * RATE_DECREASE)
+                self.last_decrease = now
+            self.tokens = min(self.tokens, 0)
+
+
+def table_names(params):
+    """Return the tables a request (API parameters, plain or serialized) reads or writes."""
+    if 'TableName' in params:
+        return [params['TableName']]
+    if 'RequestItems' in params:
+        return list(params['RequestItems'])
+    if 'TransactItems' in params:
+        # Each transact item is {'Put'|'Update'|'Delete'|'ConditionCheck'|'Get': {'TableName': ...}}
+        return list({action['TableName'] for item in params['TransactItems'] for action in item.values()})
+    return []
+
+
+class CapacityLimiter:
+    """Per-table read and write token buckets, hooked into one or more dynamodb clients with register().
+
+    client is the client the tables are described with.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.buckets = {}  # table name -> {'read': TokenBucket or None, 'write': TokenBucket or None}
+        self.lock = threading.Lock()
+
+    def register(self, client=None):
+        """Limit the calls made with client (Default: the limiter's own client)."""
+        events = (client or self.client).meta.events
+        for operation in READ_OPERATIONS + WRITE_OPERATIONS:
+            events.register('before-parameter-build.dynamodb.%s' % operation, self._before_parameter_build)
+            events.register('after-call.dynamodb.%s' % operation, self._after_call)
+            events.register('needs-retry.dynamodb.%s' % operation, self._needs_retry)
+        return self
+
+    def table_buckets(self, table_name):
+        with self.lock:
+            if table_name not in self.buckets:
+                try:
+                    table = self.client.describe_table(TableName=table_name)['Table']
+                except self.client.exceptions.ResourceNotFoundException:
+                    # Not created yet, try again on the next request
+                    return {'read': None, 'write': None}
+                throughput = table.get('ProvisionedThroughput', {})
+                # On-demand tables report 0 provisioned units
+                self.buckets[table_name] = {
+                    'read': TokenBucket(throughput['ReadCapacityUnits']) if throughput.get('ReadCapacityUnits') else None,
+                    'write': TokenBucket(throughput['WriteCapacityUnits']) if throughput.get('WriteCapacityUnits') else None,
+                }
+            return self.buckets[table_name]
+
+    def _buckets(self, operation, tables):
+        direction = 'read' if operation in READ_OPERATIONS else 'write'
+        buckets = (self.table_buckets(table_name)[direction] for table_name in tables)
+        return [bucket for bucket in buckets if bucket is not None]
+
+    def _before_parameter_build(self, params, model, **kwargs):
+        params.setdefault('ReturnConsumedCapacity', 'TOTAL')
+        for bucket in self._buckets(model.name, table_names(params)):
+            bucket.wait()
+
+    def _after_call(self, parsed, model, **kwargs):
+        consumed = parsed.get('ConsumedCapacity') or []
+        # A list for batch and transact requests
+        if isinstance(consumed, dict):
+            consumed = [consumed]
+        for capacity in consumed:
+            for bucket in self._buckets(model.name, [capacity['TableName']]):
+                bucket.consume(capacity.get('CapacityUnits', 0))
+
+    def _needs_retry(self, response, operation, request_dict, **kwargs):
+        # Returns None, so botocore's own retry handler still decides on the retry and its delay
+        if response is None or response[1].get('Error', {}).get('Code') not in THROTTLE_CODES:
+            return
+        params = json.loads(request_dict.get('body') or '{}')
+        for bucket in self._buckets(operation.name, table_names(params)):
+            bucket.throttled()
+
+
+def _config():
+    return Config(max_pool_connections=MAX_POOL_CONNECTIONS,
+                  retries={'mode': 'standard', 'max_attempts': MAX_ATTEMPTS})
+
+
+def client():
+    """Return the process wide, low-level dynamodb client, rate limited by the shared CapacityLimiter.
+
+    It is never attached to a resource, so requests and responses keep the low-level
+    attribute value format ({'S': ...}) the dynamodb_bulk helpers work with.
+    """
+    global _client, _limiter
+    with _client_lock:
+        if _client is None:
+            _client = boto3.session.Session().client('dynamodb', config=_config())
+            _limiter = CapacityLimiter(_client).register()
+        return _client
+
+
+def resource():
+    """Return this thread's dynamodb resource; its own client shares client()'s token buckets."""
+    dynamodb = getattr(_local, 'resource', None)
+    if dynamodb is None:
+        region_name = client().meta.region_name
+        # A session per resource, as sessions are not thread safe either
+        dynamodb = boto3.session.Session().resource('dynamodb', region_name=region_name, config=_config())
+        _limiter.register(dynamodb.meta.client)
+        _local.resource = dynamodb
+    return dynamodb
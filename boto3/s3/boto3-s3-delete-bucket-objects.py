@@ -7,6 +7,7 @@ Technologies: python, boto3
 Related Boto3 Documentation:
     https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/s3.html
     https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/s3/client/get_bucket_policy_status.html
+    https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/s3/client/delete_objects.html
 
 To run in Cloud 9 environment:
     python3 filename
@@ -15,33 +16,102 @@ OR
 
 Author: Brendan Tuckey
 File location: https://github.com/brendantuckey/aws-code-snippets/blob/latest/boto3/s3
-Updated: 3/24/2024
+Updated: 10/18/2026
+
+Every object version and delete marker (for an unversioned bucket, every object with
+version "null") is listed with list_object_versions and deleted 1,000 at a time with
+DeleteObjects, with the batches sent from a thread pool. Keys that fail are retried,
+progress is printed as it goes and any keys still failing are reported at the end.
+
+Usage:
+    python3 boto3-s3-delete-bucket-objects.py [bucket name] [--workers 16]
 """
 #!/usr/bin/python3
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 import boto3
+from botocore.config import Config
+
+DELETE_BATCH_SIZE = 1000  # DeleteObjects limit
+DELETE_WORKERS = 16
+MAX_ATTEMPTS = 5  # DeleteObjects calls per batch while some keys fail
+PROGRESS_EVERY = 100000  # objects
+
+def iter_delete_batches(client, bucket_name):
+    """Yield lists of up to 1,000 {'Key', 'VersionId'} for every object version and delete marker."""
+    batch = []
+    paginator = client.get_paginator('list_object_versions')
+    for page in paginator.paginate(Bucket=bucket_name):
+        for version in page.get('Versions', []) + page.get('DeleteMarkers', []):
+            batch.append({'Key': version['Key'], 'VersionId': version['VersionId']})
+            if len(batch) == DELETE_BATCH_SIZE:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+def delete_batch(client, bucket_name, objects):
+    """Delete one batch, retrying the keys DeleteObjects reports errors for; returns (deleted, errors)."""
+    deleted = 0
+    errors = []
+    for attempt in range(MAX_ATTEMPTS):
+        if attempt:
+            time.sleep(2 ** attempt * 0.1)
+        response = client.delete_objects(Bucket=bucket_name, Delete={'Objects': objects, 'Quiet': True})
+        # Quiet mode only reports the keys that failed
+        errors = response.get('Errors', [])
+        deleted += len(objects) - len(errors)
+        failed = {(error['Key'], error.get('VersionId')) for error in errors}
+        objects = [obj for obj in objects if (obj['Key'], obj['VersionId']) in failed]
+        if not objects:
+            break
+    return deleted, errors
 
 """
 Deletes the ojects in an S3 bucket to get the bucket ready for deleting
 """
-def delete_bucket(bucket_name):
+def delete_bucket(bucket_name, workers=DELETE_WORKERS):
     AWS_REGION = "us-east-2"
     #S3_BUCKET_NAME = "my-hands-on-lab-Demo"
-    s3_resource = boto3.resource("s3", region_name=AWS_REGION)
-    s3_bucket = s3_resource.Bucket(bucket_name)
+    config = Config(max_pool_connections=workers, retries={'mode': 'standard', 'max_attempts': 10})
+    client = boto3.client("s3", region_name=AWS_REGION, config=config)
 
     def cleanup_s3_bucket():
-        # Deleting objects
-        for s3_object in s3_bucket.objects.all():
-            s3_object.delete()
-        
-        # Deleting objects versions if S3 versioning enabled
-        for s3_object_ver in s3_bucket.object_versions.all():
-            s3_object_ver.delete()
-        print("S3 Bucket cleaned up")
+        # Deleting objects, and object versions if S3 versioning enabled
+        start = time.time()
+        deleted = 0
+        failed = []
+
+        def collect(futures):
+            nonlocal deleted
+            for future in futures:
+                batch_deleted, errors = future.result()
+                if deleted // PROGRESS_EVERY != (deleted + batch_deleted) // PROGRESS_EVERY:
+                    print("Deleted %d objects (%.0f/s)" % (deleted + batch_deleted, (deleted + batch_deleted) / (time.time() - start)))
+                deleted += batch_deleted
+                failed.extend(errors)
+
+        pending = set()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for objects in iter_delete_batches(client, bucket_name):
+                # Keep a bounded number of batches in flight so listing doesn't run ahead
+                if len(pending) >= workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+                pending.add(executor.submit(delete_batch, client, bucket_name, objects))
+            collect(pending)
+        for error in failed:
+            print("Could not delete %s (version %s): %s" % (error['Key'], error.get('VersionId'), error.get('Message')))
+        print("S3 Bucket cleaned up: %d objects deleted in %.1f seconds, %d failed" % (deleted, time.time() - start, len(failed)))
+        return not failed
 
     cleanup_s3_bucket()
     # Then we'd need to do the boto3-delete-empty-bucket.py
 
-# Could work out how to pass the bucket name in or read it from a file
 if __name__ == '__main__':
-    delete_bucket("unique-bucket-name")
+    args = argparse.ArgumentParser(description="Delete all objects (and object versions) in a bucket")
+    args.add_argument('bucket_name', nargs='?', default="unique-bucket-name", help="Bucket to empty")
+    args.add_argument('--workers','-w', type=int, default=DELETE_WORKERS, help="DeleteObjects requests sent at the same time (Default: %d)" % DELETE_WORKERS)
+    args = args.parse_args()
+    delete_bucket(args.bucket_name, args.workers)
@@ -14,30 +14,58 @@ OR
 
 Author: Brendan Tuckey
 File location: https://github.com/brendantuckey/aws-code-snippets/blob/latest/boto3/s3
-Updated: 3/24/2024
+Updated: 10/18/2026
 """
 #!/usr/bin/python3
+import threading
 import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError
+from concurrent.futures import ThreadPoolExecutor
 from pprint import pprint
 
+MAX_WORKERS = 16  # buckets checked at the same time
+
+config = Config(max_pool_connections=MAX_WORKERS)
+s3 = boto3.client('s3', config=config)
+clients = {}  # region -> s3 client, so each bucket is read from its own region
+clients_lock = threading.Lock()
+
+def regional_client(bucket):
+    region = bucket.get('BucketRegion')
+    if not region:
+        location = s3.get_bucket_location(Bucket=bucket['Name'])['LocationConstraint']
+        region = {None: 'us-east-1', 'EU': 'eu-west-1'}.get(location, location)
+    with clients_lock:
+        if region not in clients:
+            clients[region] = boto3.client('s3', region_name=region, config=config)
+        return clients[region]
+
+def bucket_encryption(bucket):
+    """Return (rules, None) for a bucket, (None, None) when it has no SSE or (None, error)."""
+    try:
+        enc = regional_client(bucket).get_bucket_encryption(Bucket=bucket['Name'])
+        return enc['ServerSideEncryptionConfiguration']['Rules'], None
+    except ClientError as e: # if causes an exception error we knowit doesn't have SSE
+        if e.response['Error']['Code'] == 'ServerSideEncryptionConfigurationNotFoundError':
+            return None, None
+        return None, e
+
 """
 Checks whether server-side encryption (SSE) configuration rule on
 the bucket is enabled or not.
 There is no option anymore to not have an encrypted bucket so it would only be for old buckets
+Buckets are checked concurrently, each with a client for its own region.
 """
-s3 = boto3.client('s3')
-response = s3.list_buckets()
-for bucket in response['Buckets']:
-    try:
-        enc = s3.get_bucket_encryption(Bucket=bucket['Name'])
-        rules = enc['ServerSideEncryptionConfiguration']['Rules']
-        print('Bucket: ', bucket['Name'])
-        pprint('Encryption data: %s' % (rules))
-        print('------------------------------------------------------')
-    except ClientError as e: # if causes an exception error we knowit doesn't have SSE
-        if e.response['Error']['Code'] == 'ServerSideEncryptionConfigurationNotFoundError':
+buckets = s3.list_buckets()['Buckets']
+with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+    results = executor.map(bucket_encryption, buckets)
+    for bucket, (rules, error) in zip(buckets, results):
+        if error:
+            pprint("Bucket: %s, unexpected error: %s" % (bucket['Name'], error))
+        elif rules:
+            print('Bucket: ', bucket['Name'])
+            pprint('Encryption data: %s' % (rules))
+            print('------------------------------------------------------')
+        else: # no configuration found means it doesn't have SSE
             pprint('Bucket: %s, no server-side encryption' % (bucket['Name']))
-        else:
-            pprint("Bucket: %s, unexpected error: %s" % (bucket['Name'], e))
-
@@ -14,34 +14,59 @@ OR
 
 Author: Brendan Tuckey
 File location: https://github.com/brendantuckey/aws-code-snippets/blob/latest/boto3/s3
-Updated: 3/24/2024
+Updated: 10/18/2026
 """
 
+import threading
 import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError
+from concurrent.futures import ThreadPoolExecutor
+
+MAX_WORKERS = 16  # buckets checked at the same time
 
 # Create an S3 client
-s3_client = boto3.client('s3')
+config = Config(max_pool_connections=MAX_WORKERS)
+s3_client = boto3.client('s3', config=config)
+clients = {}  # region -> s3 client, so each bucket is read from its own region
+clients_lock = threading.Lock()
 
-# Get a list of all buckets
-response = s3_client.list_buckets()
+def regional_client(bucket):
+    region = bucket.get('BucketRegion')
+    if not region:
+        location = s3_client.get_bucket_location(Bucket=bucket['Name'])['LocationConstraint']
+        region = {None: 'us-east-1', 'EU': 'eu-west-1'}.get(location, location)
+    with clients_lock:
+        if region not in clients:
+            clients[region] = boto3.client('s3', region_name=region, config=config)
+        return clients[region]
 
-# Iterate through each bucket
-for bucket in response['Buckets']:
-    bucket_name = bucket['Name']
-    
+def policy_status(bucket):
+    """Return (PolicyStatus or None, None) for a bucket, or (None, error)."""
     try:
         # Get the bucket policy status
-        policy_status = s3_client.get_bucket_policy_status(Bucket=bucket_name)
-        
-        # Check if the bucket policy allows public access
-        if policy_status['PolicyStatus']['IsPublic']:
-            print(f"Bucket {bucket_name} has public access")
+        return regional_client(bucket).get_bucket_policy_status(Bucket=bucket['Name'])['PolicyStatus'], None
     except ClientError as e:
         # If NoSuchBucketPolicy error occurs, bucket does not have a policy
         # Implying that no public access exists through a bucket policy
         # So 'NoSuchBucketPolicy' is a valid response implying no public access
-        if e.response['Error']['Code'] != 'NoSuchBucketPolicy':
-            # Handle other errors though
-            print(f"Error retrieving policy status for bucket {bucket_name}: {e}")
+        if e.response['Error']['Code'] == 'NoSuchBucketPolicy':
+            return None, None
+        return None, e
 
+# Get a list of all buckets
+buckets = s3_client.list_buckets()['Buckets']
+
+# Get the policy status of all buckets concurrently
+with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+    results = executor.map(policy_status, buckets)
+
+    # Iterate through each bucket
+    for bucket, (status, error) in zip(buckets, results):
+        bucket_name = bucket['Name']
+        if error:
+            # Handle other errors though
+            print(f"Error retrieving policy status for bucket {bucket_name}: {error}")
+        # Check if the bucket policy allows public access
+        elif status and status['IsPublic']:
+            print(f"Bucket {bucket_name} has public access")
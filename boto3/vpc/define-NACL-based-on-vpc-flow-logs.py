@@ -7,7 +7,7 @@ to build out proper Network Access Control Lists
 Technologies: python, boto3
 
 Related Boto3 Documentation:
-
+    https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/ec2/client/create_network_acl_entry.html
 
 To run in Cloud 9 environment:
     python3 filename
@@ -16,119 +16,218 @@ OR
 
 Author: Brendan Tuckey
 File location: https://github.com/brendantuckey/aws-code-snippets/blob/latest/boto3/vpc
-Updated: 3/29/2024
+Updated: 10/18/2026
 
 Prerequisites:
 A Default VPC with the name tag "Default" should be associated with your account
+
+Usage:
+    python3 define-NACL-based-on-vpc-flow-logs.py [--logs <file, directory or glob>] [--workers N] [--rule-budget 20]
+                                                  [--nacl-id <existing NACL ID> [--dry-run]] [--rule-numbers 5000 5990]
+                                                  [--checkpoint <file> [--window-days 30]]
+                                                  [--cidrs <CIDR> ...] [--port-limit 1023]
+
+--logs accepts plain .log and gzipped .log.gz files (eg. a directory synced from the
+flow log S3 bucket); the files are parsed in a process pool.
+The observed hosts and ports are aggregated into CIDR blocks and port ranges so each
+direction fits in --rule-budget NACL entries; any merge that allows extra traffic is reported.
+With --nacl-id the existing NACL is reconciled instead of creating a new one: only the
+entries that differ are created, replaced or deleted (--dry-run prints the plan only).
+The generated entries use the rule numbers in --rule-numbers; only allow entries in that
+range are ever changed, so hand-made entries should be numbered outside it. A warning is
+printed when an existing deny numbered below a generated allow overrides it.
+With --checkpoint the accumulated rules and a per-file offset watermark are saved, so the
+next run only parses new log files or bytes; rules not seen for --window-days age out.
+Traffic is classified as inbound/outbound using the CIDR blocks of the target VPC (the
+VPC of --nacl-id, or the Default VPC); --cidrs overrides them.
 """
 
 #!/usr/bin/python
+import time
+import argparse
 import boto3
+import vpc_flow_logs
+from vpc_flow_logs import rule_cidr
 
-#---------------------------------------------------------
-# Open and read the vpcflow.log file and standardize the data
-#---------------------------------------------------------
-f = open('vpcflow.log', 'r')
-logs = f.readlines()
-f.close()
-# Get headers row
-headers_row = logs[0]
-fields = headers_row.split()
-
-# Build out dictionary to reference logs
-logs_dictionaries = []
-for l in logs[1:]:
-    record = {}
-    line = l.split()
-    col_count = 0
-    for field in fields:
-        record[field] = line[col_count]
-        col_count = col_count + 1
-    logs_dictionaries.append(record)
-
-# Instantiate two sets of dictionaries for inbound and outbound rule sets
-inbound_rules_dict = {}
-outbound_rules_dict = {}
-
-# Start looping thru each log line
-for log_line in logs_dictionaries:
-    # Only look for accepted traffic
-    if log_line['action'] == 'ACCEPT':
-        
-        if log_line['srcaddr'].startswith('10.') and int(log_line['srcport']) < 1023:
-            # Create outbound ACL, traffic flowing out of our VPC
-            # Use srcaddr, dstaddr, and srcport value to create a unique key for dictionary
-            # Store these rules in the outbound_rules_dict dictionary
-            rule = (log_line['srcaddr'], log_line['dstaddr'], log_line['srcport'], log_line['dstport'], log_line['protocol'])
-            key_name = "{}_{}_{}".format(log_line['srcaddr'], log_line['dstaddr'], log_line['srcport'])
-            outbound_rules_dict[key_name] = rule
-
-        if log_line['dstaddr'].startswith('10.') and int(log_line['dstport']) <1023:
-            # Create inbound ACL, traffic flowing into our VPC
-            # Use srcaddr, dstaddr, and dstport value to create a unique key for dictionary
-            # Store these rules in the inbound_rules_dict dictionary
-            rule = (log_line['srcaddr'], log_line['dstaddr'], log_line['srcport'], log_line['dstport'], log_line['protocol'])
-            key_name = "{}_{}_{}".format(log_line['srcaddr'], log_line['dstaddr'], log_line['dstport'])
-            inbound_rules_dict[key_name] = rule
-
-# Now the data should be standardized...
-            
-#---------------------------------------------------------
-# Create a NACL
-#---------------------------------------------------------
-
-# Get the default VPC ID
-region = 'us-east-1'
-ec2 = boto3.resource('ec2', region_name=region)
-client = boto3.client('ec2', region_name=region)
-filters = [{'Name':'tag:Name', 'Values':['Default']}]
-
-#Should return only the Default VPC ID
-vpcs = list(ec2.vpcs.filter(Filters=filters))
-vpc_id = vpcs[0].id
-
-# Build out NACLs
-response = client.create_network_acl(VpcId=vpc_id)
-nacl_id = response['NetworkAcl']['NetworkAclId']
-
-# Loop thru the inbound rules dictionary to define NACL entries
-# Create INBOUND entries
-rule_number = 100 # start rule numbering at 100 and increment by 10 for each new rule
-for rule in inbound_rules_dict.values():
-    # rule tuple === (src address, dst address, src port, dst port, protocol)
-    response = client.create_network_acl_entry(
-        CidrBlock='{}/32'.format(rule[0]),
-        Egress=False,
-        NetworkAclId=nacl_id,
-        PortRange={
-            'From': int(rule[3]),
-            'To': int(rule[3]),
-        },
-        Protocol=rule[-1],
-        RuleAction='allow',
-        RuleNumber=rule_number
-    )
-    print(f"Inbound rule {rule_number}: Allow {rule[3]} for {rule[0]} -- {response}")
-    rule_number = rule_number + 10
-    
-
-# Loop thru the outbound rules dictionary to define NACL entries
-# Create OUTBOUND entries
-rule_number = 100 # start rule numbering at 100 and increment by 10 for each new rule
-for rule in outbound_rules_dict.values():
+LOG_FILE = 'vpcflow.log'
+WINDOW_DAYS = 30
+REGION = 'us-east-1'
+
+
+def aggregate(rules_dict, egress, budget):
+    """Aggregate a rules dictionary into at most budget CIDR/port range rules, reporting lossy merges."""
+    direction = "Outbound" if egress else "Inbound"
     # rule tuple === (src address, dst address, src port, dst port, protocol)
-    response = client.create_network_acl_entry(
-        CidrBlock='{}/32'.format(rule[0]),
-        Egress=True,
+    # Outbound rules allow the source port, inbound rules the destination port
+    port_index = 2 if egress else 3
+    observations = {(rule[0], rule[port_index], rule[4]) for rule in rules_dict.values()}
+    rules, merges = vpc_flow_logs.aggregate_rules(observations, budget)
+    for merged, extra_addresses, extra_ports in merges:
+        print(f"{direction} merge into {rule_cidr(merged)} ports {merged[2]}-{merged[3]}: allows {extra_addresses} extra addresses and {extra_ports} extra ports")
+    print(f"{direction}: {len(observations)} observed host/port pairs aggregated into {len(rules)} rules")
+    if len(rules) > budget:
+        print(f"WARNING: {direction} rules exceed the budget of {budget} (rules for different protocols are never merged)")
+    return rules
+
+
+def vpc_cidr_blocks(client, vpc_id):
+    """Return the IPv4 CIDR blocks associated with a VPC."""
+    vpc = client.describe_vpcs(VpcIds=[vpc_id])['Vpcs'][0]
+    return [association['CidrBlock'] for association in vpc.get('CidrBlockAssociationSet', [])
+            if association['CidrBlockState']['State'] == 'associated']
+
+
+def put_nacl_entry(client, action, nacl_id, rule_number, rule, egress):
+    """Create or replace (action) one allow entry for an aggregated rule."""
+    # rule tuple === (network, prefix length, from port, to port, protocol)
+    put_entry = client.create_network_acl_entry if action == 'create' else client.replace_network_acl_entry
+    return put_entry(
+        CidrBlock=rule_cidr(rule),
+        Egress=egress,
         NetworkAclId=nacl_id,
         PortRange={
-            'From': int(rule[2]),
-            'To': int(rule[2]),
+            'From': rule[2],
+            'To': rule[3],
         },
-        Protocol=rule[-1],
+        Protocol=str(rule[4]),
         RuleAction='allow',
         RuleNumber=rule_number
     )
-    print(f"Outbound rule {rule_number}: Allow {rule[2]} for {rule[0]} -- {response}")
-    rule_number = rule_number + 10
-    
\ No newline at end of file
+
+
+def create_nacl_entries(client, nacl_id, rules, egress, first_number=vpc_flow_logs.FIRST_RULE_NUMBER):
+    """Create one allow entry per aggregated rule, numbered from first_number in steps of 10."""
+    direction = "Outbound" if egress else "Inbound"
+    rule_number = first_number # start rule numbering at the managed range and increment by 10 for each new rule
+    for rule in rules:
+        response = put_nacl_entry(client, 'create', nacl_id, rule_number, rule, egress)
+        print(f"{direction} rule {rule_number}: Allow {rule[2]}-{rule[3]} for {rule_cidr(rule)} -- {response}")
+        rule_number = rule_number + vpc_flow_logs.RULE_NUMBER_STEP
+
+
+def reconcile_nacl_entries(client, nacl_id, entries, rules, egress, dry_run=False,
+                           first_number=vpc_flow_logs.FIRST_RULE_NUMBER, last_number=vpc_flow_logs.LAST_RULE_NUMBER):
+    """Apply only the create/replace/delete calls needed to make an existing NACL direction match rules.
+
+    Only the allow entries numbered first_number..last_number are changed.
+    """
+    direction = "Outbound" if egress else "Inbound"
+    plan = vpc_flow_logs.plan_nacl_changes(entries, rules, egress, first_number, last_number)
+    print(f"{direction}: {len(rules)} rules, {len(plan)} change(s) needed")
+    for deny_number, rule_number, rule in vpc_flow_logs.shadowing_denies(entries, plan, egress):
+        print(f"WARNING: {direction} rule {rule_number} (Allow {rule[2]}-{rule[3]} for {rule_cidr(rule)}) "
+              f"comes after deny rule {deny_number}, which overrides it for the traffic both match")
+    for action, rule_number, rule in plan:
+        if action == 'delete':
+            print(f"{direction} rule {rule_number}: delete")
+            if not dry_run:
+                client.delete_network_acl_entry(Egress=egress, NetworkAclId=nacl_id, RuleNumber=rule_number)
+        else:
+            print(f"{direction} rule {rule_number}: {action} Allow {rule[2]}-{rule[3]} for {rule_cidr(rule)}")
+            if not dry_run:
+                put_nacl_entry(client, action, nacl_id, rule_number, rule, egress)
+
+
+def main(args):
+    client = boto3.client('ec2', region_name=REGION)
+
+    #---------------------------------------------------------
+    # Find the target VPC and the networks that count as ours
+    #---------------------------------------------------------
+    if args.nacl_id:
+        nacl = client.describe_network_acls(NetworkAclIds=[args.nacl_id])['NetworkAcls'][0]
+        vpc_id = nacl['VpcId']
+    else:
+        # Get the default VPC ID
+        ec2 = boto3.resource('ec2', region_name=REGION)
+        filters = [{'Name':'tag:Name', 'Values':['Default']}]
+
+        #Should return only the Default VPC ID
+        vpcs = list(ec2.vpcs.filter(Filters=filters))
+        vpc_id = vpcs[0].id
+    networks = vpc_flow_logs.PrefixSet(args.cidrs or vpc_cidr_blocks(client, vpc_id))
+    print("Classifying traffic for %s using %s and ports below %d" % (vpc_id, ", ".join(networks.cidrs), args.port_limit))
+
+    #---------------------------------------------------------
+    # Stream the flow log file(s) and standardize the data
+    #---------------------------------------------------------
+    # Only the needed columns are kept and each chunk is folded into the
+    # inbound and outbound rule sets, so memory stays flat for large logs
+    log_files = vpc_flow_logs.find_logs(args.logs)
+    if not log_files:
+        print("No flow logs found for %s" % args.logs)
+        return
+    if args.checkpoint:
+        # Incremental: only parse new files/bytes and add them to the saved rules
+        checkpoint = vpc_flow_logs.Checkpoint(args.checkpoint, networks, args.port_limit)
+        if checkpoint.reset:
+            print("Checkpoint %s was built with other --cidrs or --port-limit, parsing all logs again" % args.checkpoint)
+        work = checkpoint.pending(log_files)
+        print("Parsing %d new or grown flow log file(s) of %d..." % (len(work), len(log_files)))
+        inbound, outbound, end_offsets = vpc_flow_logs.build_rules_parallel(
+            [path for path, offset in work], args.workers, offsets=[offset for path, offset in work],
+            networks=networks, port_limit=args.port_limit)
+        now = time.time()
+        checkpoint.update(inbound, outbound, end_offsets, now)
+        checkpoint.prune(args.window_days * 24 * 3600, now)
+        checkpoint.save()
+        inbound_rules_dict, outbound_rules_dict = checkpoint.inbound_rules_dict, checkpoint.outbound_rules_dict
+    else:
+        print("Parsing %d flow log file(s)..." % len(log_files))
+        inbound_rules_dict, outbound_rules_dict, end_offsets = vpc_flow_logs.build_rules_parallel(
+            log_files, args.workers, networks=networks, port_limit=args.port_limit)
+
+    # Now the data should be standardized...
+
+    # Compress the per-host rules into CIDR blocks and port ranges within the rule budget
+    inbound_rules = aggregate(inbound_rules_dict, egress=False, budget=args.rule_budget)
+    outbound_rules = aggregate(outbound_rules_dict, egress=True, budget=args.rule_budget)
+
+    #---------------------------------------------------------
+    # Reconcile an existing NACL
+    #---------------------------------------------------------
+    if args.nacl_id:
+        entries = nacl['Entries']
+        first_number, last_number = args.rule_numbers
+        reconcile_nacl_entries(client, args.nacl_id, entries, inbound_rules, egress=False, dry_run=args.dry_run,
+                               first_number=first_number, last_number=last_number)
+        reconcile_nacl_entries(client, args.nacl_id, entries, outbound_rules, egress=True, dry_run=args.dry_run,
+                               first_number=first_number, last_number=last_number)
+        return
+
+    #---------------------------------------------------------
+    # Create a NACL
+    #---------------------------------------------------------
+
+    # Build out NACLs
+    response = client.create_network_acl(VpcId=vpc_id)
+    nacl_id = response['NetworkAcl']['NetworkAclId']
+
+    # Loop thru the aggregated inbound rules to define NACL entries
+    # Create INBOUND entries
+    create_nacl_entries(client, nacl_id, inbound_rules, egress=False, first_number=args.rule_numbers[0])
+
+    # Loop thru the aggregated outbound rules to define NACL entries
+    # Create OUTBOUND entries
+    create_nacl_entries(client, nacl_id, outbound_rules, egress=True, first_number=args.rule_numbers[0])
+
+
+if __name__ == '__main__':
+    args = argparse.ArgumentParser(description="Build a NACL from VPC Flow Log data")
+    args.add_argument('--logs','-l', default=LOG_FILE, help="Flow log file, directory or glob of .log/.log.gz files (Default: %s)" % LOG_FILE)
+    args.add_argument('--workers','-w', type=int, default=None, help="Processes used to parse the logs (Default: number of CPUs)")
+    args.add_argument('--rule-budget','-b', dest='rule_budget', type=int, default=vpc_flow_logs.RULE_BUDGET, help="Maximum NACL entries per direction (Default: %d)" % vpc_flow_logs.RULE_BUDGET)
+    args.add_argument('--nacl-id','-n', dest='nacl_id', help="Reconcile this existing NACL instead of creating a new one")
+    args.add_argument('--dry-run', dest='dry_run', action='store_true', help="With --nacl-id, only print the changes")
+    args.add_argument('--rule-numbers', dest='rule_numbers', type=int, nargs=2, metavar=('FIRST', 'LAST'),
+                      default=(vpc_flow_logs.FIRST_RULE_NUMBER, vpc_flow_logs.LAST_RULE_NUMBER),
+                      help="Rule numbers reserved for the generated entries (Default: %d %d)" % (vpc_flow_logs.FIRST_RULE_NUMBER, vpc_flow_logs.LAST_RULE_NUMBER))
+    args.add_argument('--checkpoint','-c', help="Incremental mode: file to keep the accumulated rules and parsed offsets in")
+    args.add_argument('--window-days', dest='window_days', type=int, default=WINDOW_DAYS, help="With --checkpoint, drop rules not seen for this many days (Default: %d)" % WINDOW_DAYS)
+    args.add_argument('--cidrs', nargs='+', help="Networks treated as ours when classifying traffic (Default: the VPC's CIDR blocks)")
+    args.add_argument('--port-limit', dest='port_limit', type=int, default=vpc_flow_logs.PORT_LIMIT, help="Only traffic on ports below this becomes a rule (Default: %d)" % vpc_flow_logs.PORT_LIMIT)
+    parser, args = args, args.parse_args()
+    if args.dry_run and not args.nacl_id:
+        # Without --nacl-id a new NACL is created, which has no dry run
+        parser.error("--dry-run needs --nacl-id")
+    main(args)
@@ -0,0 +1,721 @@
+"""
+Objective: Streaming VPC Flow Log parser and NACL rule builder used by
+define-NACL-based-on-vpc-flow-logs.py
+
+The log is read in fixed size chunks and only the columns the rule builder needs
+(srcaddr, dstaddr, srcport, dstport, protocol, action) are kept, packed as integers
+in arrays. Each chunk is folded into the inbound/outbound rule dictionaries and then
+dropped, so memory use depends on the number of unique rules, not on the log size.
+
+Many logs (plain .log or gzipped .log.gz, as delivered to S3) can be parsed in a
+process pool; each worker builds partial rule dictionaries that are merged at the end.
+
+aggregate_rules() compresses the per-host observations into CIDR blocks and port ranges
+so the NACL stays within a rule budget (the default NACL quota is 20 rules per direction).
+
+plan_nacl_changes() diffs the rules against an existing NACL's Entries so only the
+changed entries need an API call.
+
+Checkpoint keeps the accumulated rule dictionaries and a per-file byte offset
+watermark in a local JSON file, so incremental runs only parse new files or bytes.
+
+Traffic is classified against a PrefixSet of our networks (by default the RFC 1918
+ranges; the NACL builder passes the VPC's own CIDR blocks) and a port limit. The
+prefixes are kept as sorted, merged integer intervals, so each address test is one
+bisect however many CIDR blocks the VPC has.
+
+When NumPy is installed, each chunk is also parsed without a Python loop per line:
+the chunk is split into fields with array operations and the address, port and
+protocol fields are converted digit by digit across all records at once. The chunk is
+then classified with vectorized masks over the column arrays and the rule keys are
+deduplicated with a sort before they reach the dictionaries. Without NumPy plain
+Python loops are used.
+
+Technologies: python, numpy (optional)
+
+Related Documentation:
+    https://docs.aws.amazon.com/vpc/latest/userguide/flow-logs-records-examples.html
+
+Author: Brendan Tuckey
+File location: https://github.com/brendantuckey/aws-code-snippets/blob/latest/boto3/vpc
+Updated: 10/18/2026
+"""
+
+import os
+import glob
+import gzip
+import json
+import time
+import heapq
+import ipaddress
+from bisect import bisect_left, bisect_right, insort
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, classify() falls back to a Python loop
+    np = None
+
+CHUNK_SIZE = 4 * 1024 * 1024  # bytes read from the log at a time
+FIELD_WIDTH = 15  # longest field parsed with NumPy (a dotted IPv4 address)
+COLUMNS = ('srcaddr', 'dstaddr', 'srcport', 'dstport', 'protocol', 'action')
+
+# Networks treated as ours when no VPC CIDR blocks are given, and the port limit:
+# only traffic on ports below it becomes a rule
+PRIVATE_CIDRS = ('10.0.0.0/8', '172.16.0.0/12', '192.168.0.0/16')
+PORT_LIMIT = 1023
+
+# A plain log not modified for this many seconds is no longer being written
+SETTLE_SECONDS = 60
+
+# NACL quota: rules per network ACL, per direction
+RULE_BUDGET = 20
+
+
+def ip_to_int(addr):
+    """Pack a dotted IPv4 address (str or bytes) into an int, None if it is not IPv4 (eg. '-' or IPv6)."""
+    parts = addr.split(b'.' if isinstance(addr, bytes) else '.')
+    if len(parts) != 4:
+        return None
+    a, b, c, d = (int(p) for p in parts)
+    return (a << 24) | (b << 16) | (c << 8) | d
+
+
+def int_to_ip(value):
+    return "%d.%d.%d.%d" % (value >> 24, (value >> 16) & 0xFF, (value >> 8) & 0xFF, value & 0xFF)
+
+
+class PrefixSet:
+    """IPv4 CIDR blocks with O(log n) membership tests for integer addresses.
+
+    The blocks are stored as sorted, non-overlapping [start, end] intervals (adjacent or
+    nested blocks are merged), so a lookup is a bisect over the interval starts.
+    """
+
+    def __init__(self, cidrs):
+        self.cidrs = list(cidrs)
+        self.starts = array('I')
+        self.ends = array('I')
+        networks = sorted(ipaddress.IPv4Network(cidr, strict=False) for cidr in self.cidrs)
+        for network in networks:
+            start, end = int(network.network_address), int(network.broadcast_address)
+            if self.ends and start <= self.ends[-1] + 1:
+                self.ends[-1] = max(self.ends[-1], end)
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+
+    def __contains__(self, address):
+        i = bisect_right(self.starts, address) - 1
+        return i >= 0 and address <= self.ends[i]
+
+    def __repr__(self):
+        return "PrefixSet(%r)" % self.cidrs
+
+    def contains_many(self, addresses):
+        """Vectorized membership test for a NumPy array of integer addresses."""
+        if not self.starts:
+            return np.zeros(len(addresses), dtype=bool)
+        starts = np.frombuffer(self.starts, dtype=np.uint32)
+        ends = np.frombuffer(self.ends, dtype=np.uint32)
+        i = np.searchsorted(starts, addresses, side='right') - 1
+        return (i >= 0) & (addresses <= ends[np.maximum(i, 0)])
+
+
+PRIVATE_NETWORKS = PrefixSet(PRIVATE_CIDRS)
+
+
+class FlowLogColumns:
+    """Column arrays for one chunk of flow log records (only the columns in COLUMNS)."""
+
+    def __init__(self):
+        self.srcaddr = array('I')
+        self.dstaddr = array('I')
+        self.srcport = array('H')
+        self.dstport = array('H')
+        self.protocol = array('B')
+        self.accepted = array('B')
+        self.skipped = 0  # NODATA/SKIPDATA and IPv6 records
+
+    def __len__(self):
+        return len(self.srcaddr)
+
+    def append_chunk(self, data, positions):
+        """Parse complete flow log lines (bytes) into the column arrays."""
+        if np is not None:
+            self.append_numpy(data, positions)
+        else:
+            self.append_lines(data.split(b'\n'), positions)
+
+    def append_lines(self, lines, positions):
+        src_i, dst_i, sport_i, dport_i, proto_i, action_i = positions
+        for line in lines:
+            fields = line.split()
+            if len(fields) <= max(positions):
+                continue
+            src = ip_to_int(fields[src_i])
+            dst = ip_to_int(fields[dst_i])
+            if src is None or dst is None or fields[sport_i] == b'-':
+                self.skipped += 1
+                continue
+            self.srcaddr.append(src)
+            self.dstaddr.append(dst)
+            self.srcport.append(int(fields[sport_i]))
+            self.dstport.append(int(fields[dport_i]))
+            self.protocol.append(int(fields[proto_i]))
+            self.accepted.append(fields[action_i] == b'ACCEPT')
+
+    def append_numpy(self, data, positions):
+        # Padded with spaces so every field can be read FIELD_WIDTH bytes at a time
+        buf = np.frombuffer(data + b' ' * FIELD_WIDTH, dtype=np.uint8)
+        # Fields are the runs of bytes above ' ' (whitespace and control characters
+        # separate them): (start, end) pairs from the edges
+        space = np.ones(len(buf) + 1, dtype=bool)
+        np.less_equal(buf, 32, out=space[1:])
+        edges = np.flatnonzero(space[1:] != space[:-1])
+        starts, ends = edges[0::2].copy(), edges[1::2].copy()
+        # Index of the first field of each line, and the number of fields on it
+        line_starts = np.flatnonzero(buf == 10) + 1
+        first = np.searchsorted(starts, np.append(0, line_starts))
+        counts = np.diff(np.append(first, len(starts)))
+        # As in append_lines, lines with too few fields are ignored
+        first = first[counts > max(positions)]
+
+        def field(position):
+            index = first + position
+            return starts[index], ends[index] - starts[index]
+
+        src_i, dst_i, sport_i, dport_i, proto_i, action_i = positions
+        src, valid = _parse_fields(buf, *field(src_i), width=FIELD_WIDTH, dotted=True)
+        dst, dst_valid = _parse_fields(buf, *field(dst_i), width=FIELD_WIDTH, dotted=True)
+        srcport, srcport_valid = _parse_fields(buf, *field(sport_i), width=5)
+        dstport, dstport_valid = _parse_fields(buf, *field(dport_i), width=5)
+        protocol, protocol_valid = _parse_fields(buf, *field(proto_i), width=3)
+        action_start, action_length = field(action_i)
+        accepted = action_length == len(b'ACCEPT')
+        for k, char in enumerate(b'ACCEPT'):
+            accepted &= buf[action_start + k] == char
+        # NODATA/SKIPDATA ('-') and IPv6 records
+        valid &= dst_valid & srcport_valid & dstport_valid & protocol_valid
+        valid &= (srcport <= 0xFFFF) & (dstport <= 0xFFFF) & (protocol <= 0xFF)
+        self.skipped += len(valid) - int(np.count_nonzero(valid))
+        self.srcaddr.frombytes(src[valid].astype(np.uint32).tobytes())
+        self.dstaddr.frombytes(dst[valid].astype(np.uint32).tobytes())
+        self.srcport.frombytes(srcport[valid].astype(np.uint16).tobytes())
+        self.dstport.frombytes(dstport[valid].astype(np.uint16).tobytes())
+        self.protocol.frombytes(protocol[valid].astype(np.uint8).tobytes())
+        self.accepted.frombytes(accepted[valid].astype(np.uint8).tobytes())
+
+
+def _parse_fields(buf, starts, lengths, width, dotted=False):
+    """Vectorized int() (or ip_to_int() when dotted) of the fields buf[start:start + length].
+
+    Returns (values, valid); a field that is not a number of at most width characters
+    (or a dotted IPv4 address), eg. '-' or an IPv6 address, is not valid.
+    """
+    valid = (lengths > 0) & (lengths <= width)
+    # One row per character position, one column per field, 0 past the end of a field
+    position = np.arange(width)[:, None]
+    chars = np.lib.stride_tricks.sliding_window_view(buf, width)[starts].T.copy()
+    chars *= position < lengths
+    digit = chars - np.uint8(48)
+    is_digit = digit < 10
+    is_dot = (chars == 46) if dotted else np.zeros(chars.shape, dtype=bool)
+    valid &= (is_digit | is_dot | (chars == 0)).all(axis=0)
+    # Horner's rule per character position: a digit multiplies the current number by 10
+    # and adds itself, a dot shifts the number into value and starts the next octet
+    scale = is_digit * np.uint32(9) + np.uint32(1)
+    digit *= is_digit
+    number = np.zeros(len(starts), dtype=np.uint32)
+    if not dotted:
+        for k in range(width):
+            number = number * scale[k] + digit[k]
+        return number, valid
+    dot = is_dot.view(np.uint8)
+    keep = np.uint8(1) - dot
+    shift = dot * np.uint8(8)
+    value = np.zeros(len(starts), dtype=np.uint32)
+    octet_too_big = np.zeros(len(starts), dtype=bool)
+    for k in range(width):
+        octet_too_big |= number * dot[k] > 0xFF
+        value = (value << shift[k]) | (number * dot[k])
+        number = (number * scale[k] + digit[k]) * keep[k]
+    # Four octets of 1 to 3 digits, each at most 255
+    run = is_digit[:-3] & is_digit[1:-2] & is_digit[2:-1] & is_digit[3:]
+    empty = is_dot[0] | (is_dot[1:] & is_dot[:-1]).any(axis=0) | (buf[starts + lengths - 1] == 46)
+    valid &= (is_dot.sum(axis=0) == 3) & ~run.any(axis=0) & ~empty & ~octet_too_big & (number <= 0xFF)
+    return (value << 8) | number, valid
+
+
+def column_positions(header):
+    """Return the index of each of COLUMNS in a flow log header line."""
+    fields = header.decode().split()
+    return tuple(fields.index(column) for column in COLUMNS)
+
+
+def iter_chunks(log_file, chunk_size=CHUNK_SIZE, offset=0, final=True):
+    """Yield (FlowLogColumns, offset) for each chunk of a flow log opened in binary mode.
+
+    The first line must be the flow log header. Parsing starts at byte offset (after the
+    header if offset is 0). A partial line at the end of a chunk is carried over to the
+    next one; the yielded offset is the end of the last complete line parsed. A partial
+    last line is only parsed when final is set (ie. the file is not still being written).
+    """
+    header = log_file.readline()
+    if not header:
+        return
+    positions = column_positions(header)
+    position = log_file.tell()
+    if offset > position:
+        log_file.seek(offset)
+        position = offset
+    remainder = b''
+    while True:
+        data = log_file.read(chunk_size)
+        if not data:
+            break
+        position += len(data)
+        data = remainder + data
+        end = data.rfind(b'\n') + 1
+        remainder = data[end:]
+        columns = FlowLogColumns()
+        columns.append_chunk(data[:end], positions)
+        yield columns, position - len(remainder)
+    if final and remainder.strip():
+        columns = FlowLogColumns()
+        columns.append_chunk(remainder, positions)
+        yield columns, position
+
+
+def classify(columns, inbound_rules_dict, outbound_rules_dict, networks=PRIVATE_NETWORKS, port_limit=PORT_LIMIT):
+    """Fold one chunk of accepted traffic into the inbound and outbound rule dictionaries.
+
+    Traffic from an address in networks (a PrefixSet) on a port below port_limit is
+    outbound, traffic to one is inbound. Rules are keyed (srcaddr, dstaddr, port) and
+    stored as (srcaddr, dstaddr, srcport, dstport, protocol), all as integers. As in a
+    single pass over the log, the last record for a key wins.
+    """
+    if np is not None:
+        classify_numpy(columns, inbound_rules_dict, outbound_rules_dict, networks, port_limit)
+    else:
+        classify_python(columns, inbound_rules_dict, outbound_rules_dict, networks, port_limit)
+
+
+def classify_python(columns, inbound_rules_dict, outbound_rules_dict, networks=PRIVATE_NETWORKS, port_limit=PORT_LIMIT):
+    for i in range(len(columns)):
+        # Only look for accepted traffic
+        if not columns.accepted[i]:
+            continue
+        src, dst = columns.srcaddr[i], columns.dstaddr[i]
+        srcport, dstport = columns.srcport[i], columns.dstport[i]
+        rule = (src, dst, srcport, dstport, columns.protocol[i])
+        if srcport < port_limit and src in networks:
+            # Outbound ACL, traffic flowing out of our VPC
+            outbound_rules_dict[(src, dst, srcport)] = rule
+        if dstport < port_limit and dst in networks:
+            # Inbound ACL, traffic flowing into our VPC
+            inbound_rules_dict[(src, dst, dstport)] = rule
+
+
+def classify_numpy(columns, inbound_rules_dict, outbound_rules_dict, networks=PRIVATE_NETWORKS, port_limit=PORT_LIMIT):
+    # Zero copy views of the packed column arrays
+    src = np.frombuffer(columns.srcaddr, dtype=np.uint32)
+    dst = np.frombuffer(columns.dstaddr, dtype=np.uint32)
+    srcport = np.frombuffer(columns.srcport, dtype=np.uint16)
+    dstport = np.frombuffer(columns.dstport, dtype=np.uint16)
+    protocol = np.frombuffer(columns.protocol, dtype=np.uint8)
+    accepted = np.frombuffer(columns.accepted, dtype=np.uint8).astype(bool)
+
+    # Outbound: traffic flowing out of our VPC, inbound: traffic flowing into it
+    outbound = accepted & (srcport < port_limit) & networks.contains_many(src)
+    inbound = accepted & (dstport < port_limit) & networks.contains_many(dst)
+    for mask, port, rules_dict in ((outbound, srcport, outbound_rules_dict), (inbound, dstport, inbound_rules_dict)):
+        rows = np.flatnonzero(mask)
+        if not len(rows):
+            continue
+        # Unique (src, dst, port) keys: a stable sort keeps records for the same key in log
+        # order, so the last row of each run of equal keys is the one to keep
+        key_src, key_dst, key_port = src[rows], dst[rows], port[rows]
+        order = np.lexsort((key_port, key_dst, key_src))
+        key_src, key_dst, key_port = key_src[order], key_dst[order], key_port[order]
+        last = np.ones(len(order), dtype=bool)
+        last[:-1] = (key_src[1:] != key_src[:-1]) | (key_dst[1:] != key_dst[:-1]) | (key_port[1:] != key_port[:-1])
+        rows = rows[order[last]]
+        keys = zip(key_src[last].tolist(), key_dst[last].tolist(), key_port[last].tolist())
+        rules = zip(src[rows].tolist(), dst[rows].tolist(), srcport[rows].tolist(),
+                    dstport[rows].tolist(), protocol[rows].tolist())
+        rules_dict.update(zip(keys, rules))
+
+
+def open_log(path):
+    """Open a plain or gzipped flow log in binary mode."""
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rb')
+    return open(path, 'rb')
+
+
+def find_logs(location):
+    """Return the sorted .log/.log.gz files in a directory (recursively), matching a glob, or the single file given."""
+    if os.path.isdir(location):
+        paths = []
+        for root, dirs, files in os.walk(location):
+            paths.extend(os.path.join(root, name) for name in files if name.endswith(('.log', '.log.gz')))
+        return sorted(paths)
+    return sorted(glob.glob(location, recursive=True))
+
+
+def build_rules(path, chunk_size=CHUNK_SIZE, offset=0, final=True, networks=PRIVATE_NETWORKS, port_limit=PORT_LIMIT):
+    """Stream a flow log file from byte offset and return (inbound_rules_dict, outbound_rules_dict, end offset)."""
+    inbound_rules_dict = {}
+    outbound_rules_dict = {}
+    end_offset = offset
+    with open_log(path) as log_file:
+        for columns, end_offset in iter_chunks(log_file, chunk_size, offset, final):
+            classify(columns, inbound_rules_dict, outbound_rules_dict, networks, port_limit)
+    return inbound_rules_dict, outbound_rules_dict, end_offset
+
+
+def merge_rules(rules_dict, partial_rules_dict):
+    """Merge partial rules from one worker into rules_dict; like a single pass, later logs win on the same key."""
+    rules_dict.update(partial_rules_dict)
+    return rules_dict
+
+
+def build_rules_parallel(paths, max_workers=None, chunk_size=CHUNK_SIZE, offsets=None,
+                         networks=PRIVATE_NETWORKS, port_limit=PORT_LIMIT):
+    """Parse many flow logs in a process pool.
+
+    offsets optionally gives the byte offset to resume each file from; plain files
+    modified within SETTLE_SECONDS are then treated as still being written (see iter_chunks).
+    networks and port_limit are passed to classify().
+    Returns the merged (inbound_rules_dict, outbound_rules_dict) and {path: end offset}.
+    """
+    now = time.time()
+    finals = [offsets is None or path.endswith('.gz') or now - os.path.getmtime(path) > SETTLE_SECONDS
+              for path in paths]
+    offsets = offsets or [0] * len(paths)
+    chunk_sizes = [chunk_size] * len(paths)
+    classifiers = ([networks] * len(paths), [port_limit] * len(paths))
+    if len(paths) <= 1:
+        return _merge_results(paths, map(build_rules, paths, chunk_sizes, offsets, finals, *classifiers))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return _merge_results(paths, executor.map(build_rules, paths, chunk_sizes, offsets, finals, *classifiers))
+
+
+def _merge_results(paths, results):
+    # Results are merged in file order so the outcome matches parsing the files one by one
+    inbound_rules_dict = {}
+    outbound_rules_dict = {}
+    end_offsets = {}
+    for path, (inbound, outbound, end_offset) in zip(paths, results):
+        merge_rules(inbound_rules_dict, inbound)
+        merge_rules(outbound_rules_dict, outbound)
+        end_offsets[path] = end_offset
+    return inbound_rules_dict, outbound_rules_dict, end_offsets
+
+
+#---------------------------------------------------------
+# CIDR aggregation
+#---------------------------------------------------------
+# An aggregated rule is (network, prefix length, from port, to port, protocol),
+# with the network as an integer.
+
+def rule_cidr(rule):
+    return "%s/%d" % (int_to_ip(rule[0]), rule[1])
+
+
+def _addresses(rule):
+    return 1 << (32 - rule[1])
+
+
+def _ports(rule):
+    return rule[3] - rule[2] + 1
+
+
+def _contains(outer, inner):
+    """True if outer covers every address and port of inner."""
+    return (outer[4] == inner[4] and outer[1] <= inner[1]
+            and inner[0] >> (32 - outer[1]) == outer[0] >> (32 - outer[1])
+            and outer[2] <= inner[2] and inner[3] <= outer[3])
+
+
+def _merge(a, b):
+    """Return the smallest rule covering both a and b (same protocol)."""
+    prefix = min(a[1], b[1], 32 - (a[0] ^ b[0]).bit_length())
+    network = a[0] & ~((1 << (32 - prefix)) - 1) & 0xFFFFFFFF
+    return (network, prefix, min(a[2], b[2]), max(a[3], b[3]), a[4])
+
+
+def _extra_space(merged, a, b):
+    """Return (extra addresses, extra ports) the merged rule allows beyond a and b."""
+    # CIDR blocks are either nested or disjoint
+    if a[1] > b[1]:
+        a, b = b, a
+    nested = b[0] >> (32 - a[1]) == a[0] >> (32 - a[1])
+    addresses = _addresses(a) if nested else _addresses(a) + _addresses(b)
+    overlap = max(0, min(a[3], b[3]) - max(a[2], b[2]) + 1)
+    ports = _ports(a) + _ports(b) - overlap
+    return _addresses(merged) - addresses, _ports(merged) - ports
+
+
+def _cost(merged, a, b):
+    """Extra (address, port) pairs allowed by merging a and b."""
+    if a[1] > b[1]:
+        a, b = b, a
+    nested = b[0] >> (32 - a[1]) == a[0] >> (32 - a[1])
+    address_overlap = _addresses(b) if nested else 0
+    port_overlap = max(0, min(a[3], b[3]) - max(a[2], b[2]) + 1)
+    covered = _addresses(a) * _ports(a) + _addresses(b) * _ports(b) - address_overlap * port_overlap
+    return _addresses(merged) * _ports(merged) - covered
+
+
+class _SortedRules:
+    """Rules kept sorted by a key, so merge candidates are looked for between neighbours only."""
+
+    def __init__(self, key, rules):
+        self.key = key
+        self.items = sorted((key(rule), rule) for rule in rules)
+
+    def neighbours(self, i):
+        if 0 < i < len(self.items):
+            return [(self.items[i - 1][1], self.items[i][1])]
+        return []
+
+    def add(self, rule):
+        item = (self.key(rule), rule)
+        insort(self.items, item)
+        i = bisect_left(self.items, item)
+        return self.neighbours(i) + self.neighbours(i + 1)
+
+    def remove(self, rule):
+        i = bisect_left(self.items, (self.key(rule), rule))
+        del self.items[i]
+        return self.neighbours(i)
+
+
+def aggregate_rules(observations, budget=RULE_BUDGET):
+    """Merge (address, port, protocol) observations into the smallest set of CIDR/port range rules.
+
+    Merges that allow no extra traffic (sibling CIDRs on the same ports, adjacent ports
+    on the same CIDR) are always made. Further merges are only made while there are more
+    rules than budget, cheapest first by the number of extra (address, port) pairs they
+    allow. Rules of different protocols are never merged, so the budget can not always
+    be met.
+
+    Returns (rules, merges) where merges lists (merged rule, extra addresses, extra ports)
+    for each merge that allows extra traffic.
+    """
+    rules = {(addr, 32, port, port, protocol) for addr, port, protocol in observations}
+    # Protocol first so neighbours in both orders share a protocol where possible
+    orders = [_SortedRules(lambda r: (r[4], r[2], r[3], r[0], r[1]), rules),
+              _SortedRules(lambda r: (r[4], r[0], r[1], r[2], r[3]), rules)]
+    heap = []
+
+    def push(pairs):
+        for a, b in pairs:
+            if a[4] == b[4]:
+                merged = _merge(a, b)
+                heapq.heappush(heap, (_cost(merged, a, b), merged, a, b))
+
+    for order in orders:
+        for i in range(1, len(order.items)):
+            push(order.neighbours(i))
+
+    merges = []
+    while heap:
+        cost, merged, a, b = heapq.heappop(heap)
+        if a not in rules or b not in rules or a == b:
+            continue
+        if cost > 0 and len(rules) <= budget:
+            break
+        for rule in (a, b):
+            rules.discard(rule)
+            for order in orders:
+                push(order.remove(rule))
+        if merged not in rules:
+            rules.add(merged)
+            for order in orders:
+                push(order.add(merged))
+        if cost > 0:
+            extra_addresses, extra_ports = _extra_space(merged, a, b)
+            merges.append((merged, extra_addresses, extra_ports))
+
+    # Drop rules already covered by a wider rule
+    result = sorted(rules, key=lambda r: (r[4], r[0], r[1], r[2]))
+    result = [r for r in result if not any(o != r and _contains(o, r) for o in result)]
+    return result, merges
+
+
+#---------------------------------------------------------
+# NACL reconciliation
+#---------------------------------------------------------
+# Entries numbered FIRST_RULE_NUMBER..LAST_RULE_NUMBER belong to the builder: allows in
+# this range are created, replaced and deleted freely, anything outside it is left alone
+FIRST_RULE_NUMBER = 5000
+LAST_RULE_NUMBER = 5990
+RULE_NUMBER_STEP = 10
+DEFAULT_RULE_NUMBER = 32767  # the catch-all '*' deny entry
+
+
+def entry_rule(entry):
+    """Return the aggregated rule for an IPv4 NACL entry, None for IPv6 entries."""
+    if 'CidrBlock' not in entry:
+        return None
+    address, prefix = entry['CidrBlock'].split('/')
+    port_range = entry.get('PortRange', {'From': 0, 'To': 65535})
+    return (ip_to_int(address), int(prefix), port_range['From'], port_range['To'], int(entry['Protocol']))
+
+
+def _overlaps(a, b):
+    """True when two rules can match the same packet."""
+    if a[4] != -1 and b[4] != -1 and a[4] != b[4]:
+        return False
+    first = max(a[0], b[0])
+    last = min(a[0] + _addresses(a), b[0] + _addresses(b)) - 1
+    # Port ranges only apply to TCP and UDP; other protocols match on any port
+    ports = a[4] not in (6, 17) or b[4] not in (6, 17) or max(a[2], b[2]) <= min(a[3], b[3])
+    return first <= last and ports
+
+
+def plan_nacl_changes(entries, rules, egress, first_number=FIRST_RULE_NUMBER, last_number=LAST_RULE_NUMBER):
+    """Return the minimal [(action, rule number, rule)] plan to make a NACL direction match rules.
+
+    entries are the NACL's existing Entries (both directions). Only IPv4 allow entries
+    numbered first_number..last_number are managed: those already matching a rule are
+    kept, unmatched ones are reused with 'replace', remaining rules are added with
+    'create' on free numbers in the range and remaining managed entries get 'delete'
+    (rule None). Raises ValueError when the range has too few free numbers.
+    """
+    managed = {}
+    used_numbers = set()
+    for entry in entries:
+        if entry['Egress'] != egress:
+            continue
+        used_numbers.add(entry['RuleNumber'])
+        rule = entry_rule(entry)
+        if rule is not None and entry['RuleAction'] == 'allow' and first_number <= entry['RuleNumber'] <= last_number:
+            managed[entry['RuleNumber']] = rule
+    wanted = set(rules)
+    existing = set()
+    stale = []
+    for number in sorted(managed):
+        # Entries not wanted, or duplicating an earlier entry, are stale
+        if managed[number] in wanted and managed[number] not in existing:
+            existing.add(managed[number])
+        else:
+            stale.append(number)
+    missing = [rule for rule in rules if rule not in existing]
+
+    plan = []
+    for number, rule in zip(stale, missing):
+        plan.append(('replace', number, rule))
+    free_numbers = (number for number in range(first_number, last_number + 1, RULE_NUMBER_STEP)
+                    if number not in used_numbers)
+    for rule in missing[len(stale):]:
+        number = next(free_numbers, None)
+        if number is None:
+            raise ValueError("Not enough free rule numbers in %d-%d for %d rules" % (first_number, last_number, len(rules)))
+        plan.append(('create', number, rule))
+    for number in stale[len(missing):]:
+        plan.append(('delete', number, None))
+    return plan
+
+
+def shadowing_denies(entries, plan, egress):
+    """Return [(deny rule number, allow rule number, rule)] for planned allows an existing deny overrides.
+
+    NACL entries are evaluated in rule number order and the first match wins, so a deny
+    numbered below a planned allow (and matching some of the same traffic) blocks it.
+    The catch-all '*' deny is ignored.
+    """
+    denies = [(entry['RuleNumber'], entry_rule(entry)) for entry in entries
+              if entry['Egress'] == egress and entry['RuleAction'] == 'deny'
+              and entry['RuleNumber'] < DEFAULT_RULE_NUMBER and 'CidrBlock' in entry]
+    return [(deny_number, number, rule)
+            for action, number, rule in plan if rule is not None
+            for deny_number, deny in denies
+            if deny_number < number and _overlaps(deny, rule)]
+
+
+#---------------------------------------------------------
+# Incremental checkpoint
+#---------------------------------------------------------
+class Checkpoint:
+    """Accumulated rule dictionaries plus a per-file watermark, stored as JSON.
+
+    Plain logs are resumed from the byte offset already parsed; gzipped logs can not be
+    appended to, so they are skipped once parsed (unless their size changes). Each rule
+    also records when it was last seen so rules can age out of a rolling window.
+
+    The networks and port limit the rules were classified with are saved too; a
+    checkpoint saved with other settings is discarded (reset is set) so every log is
+    parsed again, rather than mixing rules classified two different ways.
+    """
+
+    def __init__(self, path, networks=PRIVATE_NETWORKS, port_limit=PORT_LIMIT):
+        self.path = path
+        self.settings = {'networks': [[start, end] for start, end in zip(networks.starts, networks.ends)],
+                         'port_limit': port_limit}
+        self.reset = False
+        self.files = {}
+        self.inbound_rules_dict = {}
+        self.outbound_rules_dict = {}
+        self.last_seen = {'inbound': {}, 'outbound': {}}
+        if os.path.exists(path):
+            with open(path) as checkpoint_file:
+                data = json.load(checkpoint_file)
+            if data.get('settings') != self.settings:
+                self.reset = True
+                return
+            self.files = data['files']
+            for direction, rules_dict in (('inbound', self.inbound_rules_dict), ('outbound', self.outbound_rules_dict)):
+                for key, rule, seen in data[direction]:
+                    rules_dict[tuple(key)] = tuple(rule)
+                    self.last_seen[direction][tuple(key)] = seen
+
+    def pending(self, paths):
+        """Return [(path, offset)] for the files (or parts of files) not parsed yet."""
+        work = []
+        for path in paths:
+            size = os.path.getsize(path)
+            done = self.files.get(path)
+            if path.endswith('.gz'):
+                if not done or done['size'] != size:
+                    work.append((path, 0))
+            else:
+                # A file smaller than its watermark was rotated or truncated: start again
+                offset = done['offset'] if done and done['offset'] <= size else 0
+                if not done or offset < size:
+                    work.append((path, offset))
+        return work
+
+    def update(self, inbound_rules_dict, outbound_rules_dict, end_offsets, now=None):
+        """Record newly parsed rules and advance the watermark of each parsed file."""
+        now = now or time.time()
+        for direction, rules_dict, new_rules in (('inbound', self.inbound_rules_dict, inbound_rules_dict),
+                                                 ('outbound', self.outbound_rules_dict, outbound_rules_dict)):
+            merge_rules(rules_dict, new_rules)
+            for key in new_rules:
+                self.last_seen[direction][key] = now
+        for path, offset in end_offsets.items():
+            self.files[path] = {'offset': offset, 'size': os.path.getsize(path)}
+
+    def prune(self, window_seconds, now=None):
+        """Drop rules not seen within window_seconds and watermarks of files that are gone."""
+        cutoff = (now or time.time()) - window_seconds
+        for direction, rules_dict in (('inbound', self.inbound_rules_dict), ('outbound', self.outbound_rules_dict)):
+            last_seen = self.last_seen[direction]
+            for key in [key for key, seen in last_seen.items() if seen < cutoff]:
+                del last_seen[key]
+                rules_dict.pop(key, None)
+        self.files = {path: done for path, done in self.files.items() if os.path.exists(path)}
+
+    def save(self):
+        data = {'settings': self.settings, 'files': self.files}
+        for direction, rules_dict in (('inbound', self.inbound_rules_dict), ('outbound', self.outbound_rules_dict)):
+            data[direction] = [[key, rule, self.last_seen[direction][key]] for key, rule in rules_dict.items()]
+        # Write to a temporary file first so an interrupted run keeps the previous checkpoint
+        with open(self.path + '.tmp', 'w') as checkpoint_file:
+            json.dump(data, checkpoint_file)
+        os.replace(self.path + '.tmp', self.path)